@@ -5,13 +5,14 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_migrate import Migrate
 import os
+import tempfile
 import sys
 from datetime import timedelta
 from dotenv import load_dotenv
 from flask_wtf.csrf import CSRFProtect
 from app.services.extenstions import limiter
 from app.models.TokenBlackList import TokenBlocklist
-from app.services.extenstions import db, bcrypt, jwt
+from app.services.extenstions import db, bcrypt, jwt, password_hasher, catalog_cache, grades_cache, rank_cache, orcid_cache, job_runner, revoked_tokens, token_purge_schedule, current_user_loader, orcid_client, orcid_sync_schedule, single_flight
 
 load_dotenv()
 
@@ -46,6 +47,42 @@ def create_app(config_name=None):
     app.config['WTF_CSRF_CHECK_DEFAULT'] = False
     app.config['WTF_CSRF_METHODS'] = ['POST', 'PUT', 'PATCH', 'DELETE']
     app.config['WTF_CSRF_HEADERS'] = ['X-CSRFToken', 'X-CSRF-Token']
+    # 'memory' keeps entries per worker, 'sqlite' shares them; version counters are shared either way
+    app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'memory')
+    app.config['CACHE_PATH'] = os.environ.get('CACHE_PATH')
+    app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('CACHE_MAX_ENTRIES', 256))
+    app.config['CACHE_TTL'] = int(os.environ.get('CACHE_TTL', 300))  # seconds, 0 keeps entries until invalidated
+    app.config['GRADEBOOK_BATCH_SIZE'] = int(os.environ.get('GRADEBOOK_BATCH_SIZE', 1000))
+    app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+    # seconds without a heartbeat before a queued or running job is taken to have lost its worker
+    app.config['JOB_STALE_AFTER'] = int(os.environ.get('JOB_STALE_AFTER', 300))
+    # one set of counters for every worker on the host; 'memory://' goes back to per-worker limits
+    app.config['RATELIMIT_STORAGE_URI'] = os.environ.get(
+        'RATELIMIT_STORAGE_URI',
+        f"sqlite:///{os.path.join(tempfile.gettempdir(), 'atif_courses_ratelimit.sqlite3')}"
+    )
+    app.config['CURRENT_USER_CACHE_TTL'] = int(os.environ.get('CURRENT_USER_CACHE_TTL', 15))  # seconds, 0 loads the user on every request
+    app.config['QUERY_COUNT_HEADER'] = os.environ.get('QUERY_COUNT_HEADER', '').lower() in ('1', 'true', 'yes')
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_QUEUE_DEPTH'] = int(os.environ.get('PASSWORD_HASH_QUEUE_DEPTH', 16))
+    app.config['TOKEN_PURGE_INTERVAL'] = int(os.environ.get('TOKEN_PURGE_INTERVAL', 0))  # seconds, 0 leaves purging to `flask tokens purge`
+    app.config['ORCID_API_URL'] = os.environ.get('ORCID_API_URL', 'https://pub.orcid.org/v3.0')
+    app.config['ORCID_ID'] = os.environ.get('ORCID_ID', '0000-0003-2058-3648')
+    app.config['ORCID_HTTP_CONNECT_TIMEOUT'] = float(os.environ.get('ORCID_HTTP_CONNECT_TIMEOUT', 3.05))
+    app.config['ORCID_HTTP_READ_TIMEOUT'] = float(os.environ.get('ORCID_HTTP_READ_TIMEOUT', 10))
+    app.config['ORCID_HTTP_RETRIES'] = int(os.environ.get('ORCID_HTTP_RETRIES', 2))
+    # consecutive failed calls before ORCID is treated as down, and seconds before it is tried again
+    app.config['ORCID_HTTP_BREAKER_THRESHOLD'] = int(os.environ.get('ORCID_HTTP_BREAKER_THRESHOLD', 5))
+    app.config['ORCID_HTTP_BREAKER_RESET'] = int(os.environ.get('ORCID_HTTP_BREAKER_RESET', 30))
+    # fresh for ORCID_CACHE_TTL seconds, then served stale while a background reload runs
+    app.config['ORCID_CACHE_TTL'] = int(os.environ.get('ORCID_CACHE_TTL', 3600))
+    app.config['ORCID_CACHE_MAX_STALE'] = int(os.environ.get('ORCID_CACHE_MAX_STALE', 7 * 24 * 3600))
+    app.config['ORCID_SYNC_INTERVAL'] = int(os.environ.get('ORCID_SYNC_INTERVAL', 0))  # seconds, 0 leaves syncing to `flask orcid sync`
+    # with CACHE_BACKEND=sqlite, also let only one worker on the host load a missing cache entry
+    app.config['SINGLE_FLIGHT_CROSS_WORKER'] = os.environ.get('SINGLE_FLIGHT_CROSS_WORKER', '').lower() in ('1', 'true', 'yes')
+    if os.environ.get('JOB_DIR'):
+        app.config['JOB_DIR'] = os.environ['JOB_DIR']
     frontend_url = os.environ.get('FRONTEND_URL', 'https://dratifshahzad.com')
     
     if not app.config['SECRET_KEY']:
@@ -57,10 +94,22 @@ def create_app(config_name=None):
 
     db.init_app(app)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
     jwt.init_app(app)
     csrf.init_app(app)
     migrate.init_app(app, db)
     limiter.init_app(app)
+    catalog_cache.init_app(app)
+    grades_cache.init_app(app)
+    rank_cache.init_app(app)
+    orcid_cache.init_app(app)
+    job_runner.init_app(app)
+    revoked_tokens.init_app(app)
+    token_purge_schedule.init_app(app)
+    current_user_loader.init_app(app)
+    orcid_client.init_app(app)
+    orcid_sync_schedule.init_app(app)
+    single_flight.init_app(app)
     
     # Production cookie/CORS settings for cross-subdomain communication
     app.config.setdefault("SESSION_COOKIE_DOMAIN", ".dratifshahzad.com")
@@ -92,9 +141,11 @@ def create_app(config_name=None):
     
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        jti = jwt_payload["jti"]
-        token = db.session.query(TokenBlocklist.id).filter_by(jti=jti).first()
-        return token is not None
+        return revoked_tokens.is_revoked(jwt_payload["jti"])
+
+    @jwt.user_lookup_loader
+    def load_current_user(jwt_header, jwt_payload):
+        return current_user_loader.load(int(jwt_payload["sub"]))
     
     from app.routes.auth import auth_bp
     from app.routes.courses import courses_bp
@@ -112,5 +163,11 @@ def create_app(config_name=None):
     app.register_blueprint(admin_bp, url_prefix='/api')
     app.register_blueprint(admin_ncaaa_bp, url_prefix='/api')
 
+    from app.commands import register_commands
+    register_commands(app)
+
+    from app.services.query_counter import register_query_counter
+    register_query_counter(app)
+
 
     return app
\ No newline at end of file
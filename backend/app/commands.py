@@ -0,0 +1,62 @@
+import click
+from flask.cli import AppGroup
+from app.services.extenstions import db
+
+gradebook_cli = AppGroup('gradebook', help='Gradebook maintenance commands.')
+tokens_cli = AppGroup('tokens', help='Token table maintenance commands.')
+orcid_cli = AppGroup('orcid', help='ORCID publication commands.')
+
+
+@gradebook_cli.command('rebuild-summary')
+@click.option('--course-id', type=int, default=None, help='Only this course.')
+@click.option('--verify', is_flag=True, help='Compare the stored summaries with quiz_marks instead of rebuilding.')
+def rebuild_summary(course_id, verify):
+    """Recompute the per-student and per-quiz gradebook summaries from scratch."""
+    from app.services.gradebook_summary import rebuild_summaries, verify_summaries
+
+    if verify:
+        mismatches = verify_summaries(course_id)
+        for mismatch in mismatches:
+            click.echo(f"mismatch: {mismatch}")
+        click.echo(f"{len(mismatches)} mismatched summary rows")
+        if mismatches:
+            raise SystemExit(1)
+        return
+
+    rebuild_summaries(course_id)
+    db.session.commit()
+    click.echo('Gradebook summaries rebuilt')
+
+
+@tokens_cli.command('purge')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Rows deleted per transaction.')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches per table.')
+def purge_tokens(batch_size, max_batches):
+    """Delete expired rows from token_blocklist and refresh_tokens."""
+    from flask import current_app
+    from app.services.token_purge import purge_expired_tokens
+
+    deleted = purge_expired_tokens(current_app.config, batch_size, max_batches)
+    for table, count in deleted.items():
+        click.echo(f'{table}: {count} expired rows deleted')
+
+
+@orcid_cli.command('sync')
+@click.option('--full', is_flag=True, help='Refetch every work, not only new or modified ones.')
+def sync_orcid(full):
+    """Copy the ORCID works into research_works, fetching only what changed."""
+    from app.services.orcid_sync import sync_works
+
+    counts = sync_works(full)
+    click.echo(
+        f"{counts['fetched']} works fetched, {counts['failed']} failed, "
+        f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+    )
+    if counts['failed']:
+        raise SystemExit(1)
+
+
+def register_commands(app):
+    app.cli.add_command(gradebook_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(orcid_cli)
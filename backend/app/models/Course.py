@@ -1,5 +1,6 @@
 from app.services.extenstions import db
 from datetime import datetime
+from sqlalchemy import select, func
 from .associations import student_course
 
 class Course(db.Model):
@@ -18,6 +19,14 @@ class Course(db.Model):
     )
 
     quizzes = db.relationship("Quiz", back_populates="course", cascade="all, delete")
+
+    # loaded with the course row as a correlated COUNT, rosters are served separately
+    enrollment_count = db.column_property(
+        select(func.count(student_course.c.user_id))
+        .where(student_course.c.course_id == course_id)
+        .correlate_except(student_course)
+        .scalar_subquery()
+    )
     
     def to_dict(self):
         return {
@@ -26,6 +35,5 @@ class Course(db.Model):
             "course_name": self.course_name,
             "course_description": self.course_description,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "student_names": [u.name for u in self.students],
-            "students_kauid": [u.kauid for u in self.students]
+            "enrollment_count": self.enrollment_count or 0
         }
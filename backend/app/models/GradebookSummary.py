@@ -0,0 +1,53 @@
+from app.services.extenstions import db
+from datetime import datetime
+
+class StudentGradeSummary(db.Model):
+    __tablename__ = "student_grade_summaries"
+
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.course_id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.uid"), primary_key=True)
+    mark_count = db.Column(db.Integer, nullable=False, default=0)
+    # double precision: a single-precision FLOAT loses marks from large sums and the variance with them
+    score_sum = db.Column(db.Double, nullable=False, default=0.0)
+    score_sum_squares = db.Column(db.Double, nullable=False, default=0.0)
+    score_min = db.Column(db.Double)
+    score_max = db.Column(db.Double)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        mean = self.score_sum / self.mark_count if self.mark_count else None
+        return {
+            "user_id": self.user_id,
+            "count": self.mark_count,
+            "sum": self.score_sum,
+            "mean": round(mean, 4) if mean is not None else None,
+            "min": self.score_min,
+            "max": self.score_max,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+class QuizGradeSummary(db.Model):
+    __tablename__ = "quiz_grade_summaries"
+
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.course_id"), primary_key=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey("quizzes.quiz_id"), primary_key=True)
+    mark_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Double, nullable=False, default=0.0)
+    score_sum_squares = db.Column(db.Double, nullable=False, default=0.0)
+    score_min = db.Column(db.Double)
+    score_max = db.Column(db.Double)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        mean = self.score_sum / self.mark_count if self.mark_count else None
+        variance = self.score_sum_squares / self.mark_count - mean * mean if self.mark_count else None
+        return {
+            "quiz_id": self.quiz_id,
+            "count": self.mark_count,
+            "sum": self.score_sum,
+            "mean": round(mean, 4) if mean is not None else None,
+            "std": round(max(variance, 0.0) ** 0.5, 4) if variance is not None else None,
+            "min": self.score_min,
+            "max": self.score_max,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -0,0 +1,43 @@
+from app.services.extenstions import db
+from datetime import datetime
+import json
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+
+    job_id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="queued", index=True)
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.course_id"))
+    created_by = db.Column(db.Integer, db.ForeignKey("users.uid"))
+    file_path = db.Column(db.String(255))
+    file_size = db.Column(db.Integer, default=0)
+    bytes_processed = db.Column(db.Integer, default=0)
+    rows_processed = db.Column(db.Integer, default=0)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    # refreshed by the worker holding the job; a stale one means the worker is gone
+    heartbeat_at = db.Column(db.DateTime, default=datetime.utcnow)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    def to_dict(self):
+        progress = 100.0 if self.status == "succeeded" else (
+            round(100.0 * (self.bytes_processed or 0) / self.file_size, 1) if self.file_size else 0.0
+        )
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "course_id": self.course_id,
+            "progress": min(progress, 100.0),
+            "rows_processed": self.rows_processed or 0,
+            "attempts": self.attempts or 0,
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -4,11 +4,15 @@ from .associations import student_course
 
 class QuizMark(db.Model):
     __tablename__ = "quiz_marks"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "quiz_id", name="uq_quiz_marks_user_quiz"),
+    )
 
     quiz_mark_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.uid"))
     quiz_id = db.Column(db.Integer, db.ForeignKey("quizzes.quiz_id"))
-    score = db.Column(db.Float, nullable=False)
+    # double precision so a score read back compares equal to the one parsed from the upload
+    score = db.Column(db.Double, nullable=False)
 
     student = db.relationship("User", back_populates="quiz_marks")
     quiz = db.relationship("Quiz", back_populates="marks")
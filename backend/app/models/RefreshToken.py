@@ -3,11 +3,16 @@ from datetime import datetime
 
 class RefreshToken(db.Model):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # logout revokes by uid, revoked=False
+        db.Index("ix_refresh_tokens_uid_revoked", "uid", "revoked"),
+    )
 
     refresh_token_id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(36), nullable=False, unique=True, index=True)
     uid = db.Column(db.Integer, db.ForeignKey("users.uid"), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.today)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, index=True)
     revoked = db.Column(db.Boolean, default=False)
 
     user = db.relationship("User", back_populates="refresh_tokens")
\ No newline at end of file
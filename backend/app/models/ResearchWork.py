@@ -0,0 +1,35 @@
+from app.services.extenstions import db
+from datetime import datetime
+import json
+
+class ResearchWork(db.Model):
+    __tablename__ = "research_works"
+    __table_args__ = (
+        # the About page lists by year, optionally narrowed to one type
+        db.Index("ix_research_works_year_type", "year", "work_type"),
+    )
+
+    put_code = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(1000), nullable=False)
+    work_type = db.Column(db.String(64), nullable=False, index=True)
+    year = db.Column(db.Integer)
+    journal = db.Column(db.String(1000))
+    doi = db.Column(db.String(255))
+    # ORCID's last-modified-date, milliseconds since the epoch; a sync refetches the work when it moves
+    last_modified = db.Column(db.BigInteger, nullable=False)
+    detail = db.Column(db.Text)
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        # same shape as the ORCID work summaries the About page used to receive
+        return {
+            "title": self.title,
+            "type": self.work_type,
+            "put-code": self.put_code,
+            "year": str(self.year) if self.year is not None else None,
+            "journal": self.journal,
+            "doi": self.doi,
+        }
+
+    def detail_dict(self):
+        return json.loads(self.detail) if self.detail else None
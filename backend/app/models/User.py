@@ -27,6 +27,12 @@ class User(db.Model):
     )
     
     def to_dict(self):
+        courses_names, courses_codes, course_ids = [], [], []
+        for course in self.courses:
+            courses_names.append(course.course_name)
+            courses_codes.append(course.course_code)
+            course_ids.append(course.course_id)
+
         return {
             "id": self.uid,
             "kauid": self.kauid,
@@ -34,7 +40,7 @@ class User(db.Model):
             "name": self.name,
             "role": self.role,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "courses_names": [c.course_name for c in self.courses],
-            "courses_codes": [c.course_code for c in self.courses],
-            "course_ids": [c.course_id for c in self.courses],
+            "courses_names": courses_names,
+            "courses_codes": courses_codes,
+            "course_ids": course_ids,
         }
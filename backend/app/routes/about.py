@@ -1,60 +1,90 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.Course import Course
-from app.models.User import User
-from app.models.Quiz import Quiz
-from app.models.QuizMark import QuizMark
-from app.services.utils import admin_required
-import requests
-ORCID_ID = "0000-0003-2058-3648"
-BASE_URL = f"https://pub.orcid.org/v3.0/{ORCID_ID}"
-HEADERS = {"Accept": "application/json"}
+from app.services.orcid import (
+    get_works as get_cached_works, get_work, get_work_details, local_works, local_work, local_work_details,
+    synced, OrcidError, BULK_LIMIT
+)
+from app.services.extenstions import single_flight
 
 about_bp = Blueprint('about', __name__)
 
 @about_bp.route("/orcid/researches", methods=["GET"])
+@single_flight.coalesce("orcid_researches")
 def get_works():
-    url = f"{BASE_URL}/works"
-    response = requests.get(url, headers=HEADERS)
-
-    if response.status_code != 200:
-        return jsonify({
-            "success" : False,
-            "error": "Failed to fetch researches",
-            "status": response.status_code,
-            })
-
-    data = response.json()
-
-    # Extract useful info
-    works = []
-    for group in data.get("group", []):
-        summary = group["work-summary"][0]
-        works.append({
-            "title": summary["title"]["title"]["value"],
-            "type": summary["type"],
-            "put-code": summary["put-code"],
-            "year": summary.get("publication-date", {}).get("year", {}).get("value"),
-            "journal": summary.get("journal-title", {}).get("value"),
-            "doi": next(
-                (id["value"] for id in summary.get("external-ids", {}).get("external-id", [])
-                 if id["external-id-type"] == "doi"),
-                None
-            )
-        })
+    year = request.args.get("year")
+    work_type = request.args.get("type")
+    if year is not None and not year.isdigit():
+        return jsonify({"success": False, "error": "year must be a number"}), 400
+    year = int(year) if year is not None else None
+
+    # served from research_works once `flask orcid sync` has run; ORCID itself is only asked before that
+    works = local_works(year, work_type)
+    cache_state = None
+    if not works and not synced():
+        try:
+            works, cache_state = get_cached_works()
+        except OrcidError as e:
+            return jsonify({
+                "success" : False,
+                "error": "Failed to fetch researches",
+                "status": e.status,
+                })
+        works = [
+            work for work in works
+            if (year is None or work["year"] == str(year)) and (work_type is None or work["type"] == work_type)
+        ]
 
-    return jsonify(
+    response = jsonify(
         {
             "success" : True,
             "researches" : works,
         })
+    if cache_state:
+        response.headers['X-Cache'] = cache_state.upper()
+    return response
+
+@about_bp.route("/orcid/researches/details", methods=["GET"])
+def get_work_details_batch():
+    # ?put_codes=1,2,3: several full records in one call instead of one /orcid/researche/<put_code> each
+    codes = [code.strip() for code in request.args.get("put_codes", "").split(",") if code.strip()]
+    if not codes or not all(code.isdigit() for code in codes):
+        return jsonify({"success": False, "error": "put_codes must be a comma separated list of numbers"}), 400
+    if len(codes) > BULK_LIMIT:
+        return jsonify({"success": False, "error": f"At most {BULK_LIMIT} put_codes per request"}), 400
+    put_codes = sorted({int(code) for code in codes})
+
+    works = local_work_details(put_codes)
+    cache_state = None
+    if not works and not synced():
+        try:
+            works, cache_state = get_work_details(put_codes)
+        except OrcidError as e:
+            return jsonify({"success": False, "error": "Failed to fetch works", "status": e.status})
+
+    response = jsonify({
+        "success": True,
+        "works": {str(put_code): work for put_code, work in works.items()},
+        "missing": [put_code for put_code in put_codes if put_code not in works],
+    })
+    if cache_state:
+        response.headers['X-Cache'] = cache_state.upper()
+    return response
 
 @about_bp.route("/orcid/researche/<put_code>", methods=["GET"])
 def get_single_work(put_code):
-    url = f"{BASE_URL}/work/{put_code}"
-    response = requests.get(url, headers=HEADERS)
+    if not put_code.isdigit():
+        return jsonify({"error": "Failed to fetch work", "status": 404})
+
+    work = local_work(int(put_code))
+    if work is not None:
+        return jsonify(work)
+    if synced():
+        return jsonify({"error": "Failed to fetch work", "status": 404})
 
-    if response.status_code != 200:
-        return jsonify({"error": "Failed to fetch work", "status": response.status_code})
+    try:
+        work, cache_state = get_work(int(put_code))
+    except OrcidError as e:
+        return jsonify({"error": "Failed to fetch work", "status": e.status})
 
-    return jsonify(response.json())
\ No newline at end of file
+    response = jsonify(work)
+    response.headers['X-Cache'] = cache_state.upper()
+    return response
@@ -1,11 +1,19 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.Course import Course
 from app.models.User import User
 from app.models.Quiz import Quiz
 from app.models.QuizMark import QuizMark
-from app.services.utils import admin_required
+from app.models.associations import student_course
+from app.services.utils import admin_required, encode_cursor, decode_cursor, parse_limit
+from app.models.Job import Job
+from app.services.extenstions import job_runner, orcid_client, orcid_cache, single_flight
+from app.services import gradebook_import  # registers the gradebook_import job handler
+from app.services.gradebook_stats import course_stats
+from app.models.GradebookSummary import StudentGradeSummary, QuizGradeSummary
+from app.services.quiz_rank import get_leaderboard
+from app.services.gradebook_export import iter_gradebook, iter_csv, iter_xlsx
 import csv
 
 admin_bp = Blueprint('admin', __name__)
@@ -36,6 +44,120 @@ def add_course():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
+@admin_bp.route('/admin/courses/<int:course_id>/students', methods=['GET'])
+@admin_required
+def get_course_students(course_id):
+    course = db.session.get(Course, course_id)
+    if course is None:
+        return jsonify({
+            'success': False,
+            'error': 'Course not found'
+        }), 404
+
+    try:
+        limit = parse_limit(request.args, 50, 200)
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor, 'uid') if cursor else None
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    query = db.session.query(User.uid, User.kauid, User.name, User.email) \
+        .join(student_course, student_course.c.user_id == User.uid) \
+        .filter(student_course.c.course_id == course_id)
+    if after is not None:
+        query = query.filter(User.uid > after)
+    rows = query.order_by(User.uid).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    students = [dict(row._mapping) for row in rows[:limit]]
+    return jsonify({
+        'success': True,
+        'course_id': course_id,
+        'students': students,
+        'count': len(students),
+        'total': course.enrollment_count,
+        'next_cursor': encode_cursor('uid', students[-1]['uid']) if has_more else None
+    }), 200
+
+@admin_bp.route('/admin/courses/<int:course_id>/stats', methods=['GET'])
+@admin_required
+def get_course_stats(course_id):
+    if db.session.get(Course, course_id) is None:
+        return jsonify({'success': False, 'error': 'Course not found'}), 404
+
+    try:
+        bins = int(request.args.get('bins', 10))
+        max_score = request.args.get('max_score', type=float)
+        pass_mark = request.args.get('pass_mark', type=float)
+        if not 1 <= bins <= 100:
+            raise ValueError
+    except ValueError:
+        return jsonify({'success': False, 'error': 'bins must be an integer between 1 and 100'}), 400
+
+    return jsonify({
+        'success': True,
+        'course_id': course_id,
+        **course_stats(course_id, bins=bins, max_score=max_score, pass_mark=pass_mark)
+    }), 200
+
+@admin_bp.route('/admin/courses/<int:course_id>/summary', methods=['GET'])
+@admin_required
+def get_course_summary(course_id):
+    if db.session.get(Course, course_id) is None:
+        return jsonify({'success': False, 'error': 'Course not found'}), 404
+
+    # reads the maintained summary tables, O(students + quizzes) rows instead of every mark
+    students = StudentGradeSummary.query.filter_by(course_id=course_id).order_by(StudentGradeSummary.user_id).all()
+    quizzes = QuizGradeSummary.query.filter_by(course_id=course_id).order_by(QuizGradeSummary.quiz_id).all()
+    return jsonify({
+        'success': True,
+        'course_id': course_id,
+        'students': [s.to_dict() for s in students],
+        'quizzes': [q.to_dict() for q in quizzes]
+    }), 200
+
+@admin_bp.route('/admin/courses/<int:course_id>/quizzes/<int:quiz_id>/leaderboard', methods=['GET'])
+@admin_required
+def get_quiz_leaderboard(course_id, quiz_id):
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None or quiz.course_id != course_id:
+        return jsonify({'success': False, 'error': 'Quiz not found'}), 404
+
+    entries = get_leaderboard(quiz_id)['entries']
+    return jsonify({
+        'success': True,
+        'quiz_id': quiz_id,
+        'title': quiz.title,
+        'leaderboard': entries,
+        'total': len(entries)
+    }), 200
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'xlsx': (iter_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+@admin_bp.route('/admin/courses/<int:course_id>/gradebook.<fmt>', methods=['GET'])
+@admin_required
+def export_gradebook(course_id, fmt):
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'error': 'Format must be csv or xlsx'}), 404
+
+    course = db.session.get(Course, course_id)
+    if course is None:
+        return jsonify({'success': False, 'error': 'Course not found'}), 404
+
+    # same KAUID x quiz-title layout upload_csv accepts, streamed row by row
+    writer, mimetype = EXPORT_FORMATS[fmt]
+    body = stream_with_context(iter_gradebook(course_id, writer))
+    return Response(body, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{course.course_code}_gradebook.{fmt}"',
+        'X-Accel-Buffering': 'no',
+    })
+
 @admin_bp.route("/admin/select-data", methods=['POST'])
 @admin_required
 def receive_select_data():
@@ -53,32 +175,57 @@ def receive_select_data():
 @admin_bp.route('/admin/<int:course_id>/upload_csv', methods=['POST'])
 @admin_required
 def upload_csv(course_id):
+    csvfile = request.files.get("file")
+    if csvfile is None:
+        return jsonify({'error': 'file is required'}), 400
 
-    csvfile = request.files["file"]
     course = Course.query.get_or_404(course_id)
 
-    quizzes = {q.title: q for q in course.quizzes}
-
-    reader = csv.DictReader(csvfile.stream.read().decode("utf-8").splitlines())
+    try:
+        # the file is spooled to disk and imported by the job pool, the request returns immediately
+        file_path, file_size = job_runner.spool(csvfile)
+        job = Job(
+            kind="gradebook_import",
+            course_id=course.course_id,
+            created_by=int(get_jwt_identity()),
+            file_path=file_path,
+            file_size=file_size
+        )
+        db.session.add(job)
+        db.session.commit()
+        job_runner.submit(job.job_id)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
-    for row in reader:
-        user = User.query.filter_by(kauid=row["KAUID"]).first()
-        if not user:
-            continue
+    return jsonify({
+        "message": "CSV upload queued",
+        "job_id": job.job_id,
+        "status_url": url_for('admin.get_job', job_id=job.job_id)
+    }), 202
 
-        for quiz_title, score in row.items():
-            if quiz_title == "KAUID":
-                continue
-            quiz = quizzes.get(quiz_title)
-            if not quiz:
-                quiz = Quiz(title=quiz_title, course=course)
-                db.session.add(quiz)
-                db.session.flush()
-                quizzes[quiz_title] = quiz
+@admin_bp.route('/admin/jobs/<int:job_id>', methods=['GET'])
+@admin_required
+def get_job(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()}), 200
 
-            mark = QuizMark(student=user, quiz=quiz, score=float(score))
-            db.session.add(mark)
 
-    db.session.commit()
-    return {"message": "CSV uploaded successfully"}
+@admin_bp.route('/admin/orcid/status', methods=['GET'])
+@admin_required
+def get_orcid_status():
+    return jsonify({
+        'success': True,
+        'client': orcid_client.stats(),
+        'cache': orcid_cache.stats()
+    }), 200
 
+@admin_bp.route('/admin/single-flight/stats', methods=['GET'])
+@admin_required
+def get_single_flight_stats():
+    return jsonify({
+        'success': True,
+        'single_flight': single_flight.stats()
+    }), 200
@@ -1,17 +1,59 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, delete, or_, func
 from app import db
 from app.models.NCAAA_Courses.NCAAA_Course import NCAAA_Course
 from app.services.utils import admin_required
+from app.services.catalog import get_catalog
+from app.services.extenstions import catalog_cache
+from app.services.search import catalog_search
+import csv
+import io
+import itertools
 
 admin_ncaaa_bp = Blueprint('admin_ncaaa', __name__)
 
+BULK_MAX_ROWS = 5000
+DELETE_BATCH_SIZE = 500
+
+def read_bulk_rows():
+    # JSON array in the body, or a CSV upload with course_code,course_name,course_description headers
+    if 'file' in request.files:
+        stream = io.TextIOWrapper(request.files['file'].stream, encoding='utf-8-sig')
+        # one row past the limit is enough to reject the file, the rest is never parsed
+        rows = list(itertools.islice(csv.DictReader(stream), BULK_MAX_ROWS + 1))
+    else:
+        rows = request.get_json(silent=True)
+        if isinstance(rows, dict):
+            rows = rows.get('courses')
+    if not isinstance(rows, list):
+        raise ValueError('Expected a JSON array of courses or a CSV file')
+    if len(rows) > BULK_MAX_ROWS:
+        raise ValueError(f'At most {BULK_MAX_ROWS} rows per request')
+
+    normalized = []
+    for row in rows:
+        if not isinstance(row, dict):
+            normalized.append({})
+            continue
+        row = {(k or '').strip().lower().removeprefix('ncaaa_'): v for k, v in row.items()}
+        normalized.append({
+            field: str(row[field]).strip() if row.get(field) is not None else ''
+            for field in ('course_code', 'course_name', 'course_description')
+        })
+    return normalized
+
+
+def duplicate_key(value):
+    # "CS 101" and "cs 101 " name the same course
+    return value.strip().casefold()
+
+
 @admin_ncaaa_bp.route('/admin/ncaaa/get-courses', methods=['GET'])
 @admin_required
 def get_nccaa_courses():
     try:
-        nccaa_courses = NCAAA_Course.query.all()
-        ncaaa_courses_data = [course.to_dict() for course in nccaa_courses]
+        ncaaa_courses_data = get_catalog()
         return jsonify({
             'success': True,
             'courses': ncaaa_courses_data,
@@ -25,6 +67,14 @@ def get_nccaa_courses():
             'error': str(e)
         }), 500
 
+@admin_ncaaa_bp.route('/admin/ncaaa/cache-stats', methods=['GET'])
+@admin_required
+def get_catalog_cache_stats():
+    return jsonify({
+        'success': True,
+        'cache': catalog_cache.stats()
+    }), 200
+
 @admin_ncaaa_bp.route('/admin/ncaaa/add-course', methods=['POST'])
 @admin_required 
 def add_ncaaa_course():
@@ -59,6 +109,8 @@ def add_ncaaa_course():
 
         db.session.add(course)
         db.session.commit()
+        version = catalog_cache.bump()
+        catalog_search.add_course(course, version)
 
         return jsonify({
             'success': True,
@@ -81,6 +133,8 @@ def delete_ncaaa_course(ncaaa_course_code):
     try:
         db.session.delete(ncaaa_course)
         db.session.commit()
+        version = catalog_cache.bump()
+        catalog_search.remove_course(ncaaa_course_code, version)
         return jsonify({
             'success': True,
             'message': 'NCAAA_course deleted successfully'
@@ -91,3 +145,117 @@ def delete_ncaaa_course(ncaaa_course_code):
             'success': False,
             'error': str(e),
             }), 500
+
+@admin_ncaaa_bp.route('/admin/ncaaa/bulk-add', methods=['POST'])
+@admin_required
+def bulk_add_ncaaa_courses():
+    try:
+        rows = read_bulk_rows()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    results = [{'row': i, 'course_code': row.get('course_code'), 'status': 'pending'} for i, row in enumerate(rows)]
+    candidates = []
+    seen_codes, seen_names = set(), set()
+    for result, row in zip(results, rows):
+        missing = [field for field in ('course_code', 'course_name', 'course_description') if not row.get(field)]
+        if missing:
+            result.update(status='error', error=f'{missing[0]} is required')
+        elif len(row['course_code']) > 6:
+            result.update(status='error', error='Course Code should be less than 6 numbers')
+        elif duplicate_key(row['course_code']) in seen_codes or duplicate_key(row['course_name']) in seen_names:
+            result.update(status='skipped', error='Duplicate in upload')
+        else:
+            seen_codes.add(duplicate_key(row['course_code']))
+            seen_names.add(duplicate_key(row['course_name']))
+            candidates.append((result, row))
+
+    try:
+        if candidates:
+            # one IN query finds every code or name that is already registered, whatever its case
+            existing = db.session.query(NCAAA_Course.course_code, NCAAA_Course.course_name).filter(or_(
+                func.lower(func.trim(NCAAA_Course.course_code)).in_({row['course_code'].lower() for _, row in candidates}),
+                func.lower(func.trim(NCAAA_Course.course_name)).in_({row['course_name'].lower() for _, row in candidates})
+            )).all()
+            existing_codes = {duplicate_key(code) for code, _ in existing}
+            existing_names = {duplicate_key(name) for _, name in existing}
+
+            to_insert = []
+            for result, row in candidates:
+                if duplicate_key(row['course_code']) in existing_codes or duplicate_key(row['course_name']) in existing_names:
+                    result.update(status='skipped', error='Course already registered')
+                else:
+                    to_insert.append((result, row))
+
+            if to_insert:
+                db.session.execute(insert(NCAAA_Course), [row for _, row in to_insert])
+                created = db.session.query(NCAAA_Course).filter(
+                    NCAAA_Course.course_code.in_([row['course_code'] for _, row in to_insert])
+                ).all()
+                created_ids = {course.course_code: course.course_id for course in created}
+                for result, row in to_insert:
+                    result.update(status='created', course_id=created_ids.get(row['course_code']))
+                db.session.commit()
+
+                version = catalog_cache.bump()
+                catalog_search.add_courses([course.to_dict() for course in created], version)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    summary = {status: sum(1 for r in results if r['status'] == status) for status in ('created', 'skipped', 'error')}
+    return jsonify({
+        'success': True,
+        'summary': summary,
+        'results': results
+    }), 200
+
+@admin_ncaaa_bp.route('/admin/ncaaa/bulk-delete', methods=['POST'])
+@admin_required
+def bulk_delete_ncaaa_courses():
+    data = request.get_json(silent=True)
+    course_ids = data.get('course_ids') if isinstance(data, dict) else data
+    if not isinstance(course_ids, list) or not all(isinstance(i, int) for i in course_ids):
+        return jsonify({
+            'success': False,
+            'error': 'course_ids must be a list of integers'
+        }), 400
+    if len(course_ids) > BULK_MAX_ROWS:
+        return jsonify({
+            'success': False,
+            'error': f'At most {BULK_MAX_ROWS} ids per request'
+        }), 400
+
+    course_ids = list(dict.fromkeys(course_ids))
+    try:
+        existing = set()
+        for start in range(0, len(course_ids), DELETE_BATCH_SIZE):
+            batch = course_ids[start:start + DELETE_BATCH_SIZE]
+            existing.update(i for (i,) in db.session.query(NCAAA_Course.course_id).filter(NCAAA_Course.course_id.in_(batch)))
+            db.session.execute(delete(NCAAA_Course).where(NCAAA_Course.course_id.in_(batch)))
+        db.session.commit()
+
+        if existing:
+            version = catalog_cache.bump()
+            catalog_search.remove_courses(existing, version)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    results = [{'course_id': i, 'status': 'deleted' if i in existing else 'not_found'} for i in course_ids]
+    return jsonify({
+        'success': True,
+        'summary': {'deleted': len(existing), 'not_found': len(course_ids) - len(existing)},
+        'results': results
+    }), 200
@@ -1,11 +1,14 @@
-from flask import Blueprint, request, jsonify, make_response
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, JWTManager, get_jwt, get_jti, set_access_cookies, set_refresh_cookies
-from app import db, bcrypt
+from flask import Blueprint, request, jsonify, make_response, current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, JWTManager, get_jwt, get_jti, set_access_cookies, set_refresh_cookies, current_user
+from sqlalchemy.orm import selectinload
+from app import db
 from app.models.User import User
 from app.models.TokenBlackList import TokenBlocklist
 import re
+from datetime import datetime
 from flask_wtf.csrf import generate_csrf
-from app.services.extenstions import limiter
+from app.services.extenstions import limiter, revoked_tokens, password_hasher
+from app.services.passwords import PasswordHasherBusy
 from app.models.RefreshToken import RefreshToken
 
 auth_bp = Blueprint('auth', __name__)
@@ -25,6 +28,14 @@ def validate_password(password):
         return False
     return True
 
+def refresh_token_expiry():
+    return datetime.utcnow() + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+
+def hasher_busy_response():
+    response = jsonify({'error': 'Server busy, please try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 
 @auth_bp.route('/csrf-token', methods=['GET'])
 def get_csrf_token():
@@ -64,15 +75,18 @@ def register():
         if User.query.filter_by(email=email).first():
             return jsonify({'error': 'Email already registered'}), 409
         
-        password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        password_hash = password_hasher.hash(password)
         user = User(
             email=email,
             password_hash=password_hash,
             name=data['name'].strip(),
+            # a new user has no enrollments; an empty collection spares to_dict a lazy load
+            courses=[],
         )
         
         db.session.add(user)
-        db.session.commit()
+        # flushed for its uid; the user and the refresh token are committed together
+        db.session.flush()
         
         access_token = create_access_token(
             identity=str(user.uid), 
@@ -83,12 +97,14 @@ def register():
         )
 
         jti = get_jti(refresh_token)
-        db.session.add(RefreshToken(uid=user.uid, jti=jti))
+        db.session.add(RefreshToken(uid=user.uid, jti=jti, expires_at=refresh_token_expiry()))
+        # serialized before the commit expires the user, which would reload it
+        user_data = user.to_dict()
         db.session.commit()
         
         response = make_response(jsonify({
             'message': 'User registered successfully',
-            'user': user.to_dict()
+            'user': user_data
         }), 201)
 
         set_access_cookies(response, access_token)
@@ -96,6 +112,9 @@ def register():
         
         return response
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         print(f"Registration error: {str(e)}")
@@ -111,14 +130,18 @@ def login():
 
         email = data['email'].lower().strip()
         password = data['password']
-        user = User.query.filter_by(email=email).first()
+        user = User.query.options(selectinload(User.courses)).filter_by(email=email).first()
 
-        if not user or not bcrypt.check_password_hash(user.password_hash, password):
+        if not user or not password_hasher.check(user.password_hash, password):
             return jsonify({'error': 'Invalid credentials'}), 401
 
         if not user.is_active:
             return jsonify({'error': 'Account deactivated'}), 401
 
+        if password_hasher.needs_rehash(user.password_hash):
+            # stored with an older work factor; the plain password is at hand, so upgrade it with this commit
+            user.password_hash = password_hasher.hash(password)
+
         access_token = create_access_token(
             identity=str(user.uid),
             additional_claims={"role": user.role}
@@ -126,12 +149,14 @@ def login():
         refresh_token = create_refresh_token(identity=str(user.uid))
 
         jti = get_jti(refresh_token)
-        db.session.add(RefreshToken(uid=user.uid, jti=jti))
+        db.session.add(RefreshToken(uid=user.uid, jti=jti, expires_at=refresh_token_expiry()))
+        # serialized before the commit expires the user, which would reload it and its courses
+        user_data = user.to_dict()
         db.session.commit()
 
         response = jsonify({
             'message': 'Login successful',
-            'user': user.to_dict()
+            'user': user_data
         })
 
         set_access_cookies(response, access_token)
@@ -139,6 +164,9 @@ def login():
 
         return response, 200
 
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         print(f"Login error: {str(e)}")
         return jsonify({'error': 'Login failed'}), 500
@@ -148,7 +176,6 @@ def login():
 @jwt_required(refresh=True)
 def refresh():
     try:
-        identity = get_jwt_identity()
         jti = get_jwt()['jti'] # this is the current refresh token's jti
 
         token_in_db = RefreshToken.query.filter_by(jti=jti, revoked=False).first()
@@ -157,9 +184,7 @@ def refresh():
         
         token_in_db.revoked = True
 
-        user = User.query.get(int(identity))
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        user = current_user
 
         new_access_token = create_access_token(
             identity=str(user.uid),
@@ -168,7 +193,7 @@ def refresh():
 
         new_refresh_token = create_refresh_token(identity=str(user.uid))
         new_jti = get_jti(new_refresh_token)
-        db.session.add(RefreshToken(uid=user.uid, jti=new_jti))
+        db.session.add(RefreshToken(uid=user.uid, jti=new_jti, expires_at=refresh_token_expiry()))
         db.session.commit()
         
         response = make_response(jsonify({"message": "Token refreshed"}), 200)
@@ -186,13 +211,8 @@ def refresh():
 @jwt_required()
 def get_current_user():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        return jsonify({'user': user.to_dict()}), 200
+        # loaded once per request by the JWT user loader, enrollments included
+        return jsonify({'user': current_user.to_dict()}), 200
     except Exception as e:
         print(f"Get current user error: {str(e)}")
         return jsonify({'error': 'Failed to get user'}), 401
@@ -201,27 +221,29 @@ def get_current_user():
 @jwt_required()
 def change_password():
     try:
-        current_user_id = get_jwt_identity()
         data = request.get_json()
         
         if not data.get('current_password') or not data.get('new_password'):
             return jsonify({'error': 'Current and new password required'}), 400
         
-        user = User.query.get(int(current_user_id))
+        user = db.session.get(User, current_user.uid)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        if not bcrypt.check_password_hash(user.password_hash, data['current_password']):
+        if not password_hasher.check(user.password_hash, data['current_password']):
             return jsonify({'error': 'Current password incorrect'}), 401
         
         if not validate_password(data['new_password']):
             return jsonify({'error': 'New password must be at least 8 characters with uppercase, lowercase, and number'}), 400
         
-        user.password_hash = bcrypt.generate_password_hash(data['new_password']).decode('utf-8')
+        user.password_hash = password_hasher.hash(data['new_password'])
         db.session.commit()
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         print(f"Change password error: {str(e)}")
@@ -232,16 +254,18 @@ def change_password():
 def logout():
     try:
         jti = get_jwt()["jti"]
+        expires_at = get_jwt()["exp"]
         token_type = get_jwt()["type"]
         identity = get_jwt_identity()
 
         if token_type == "refresh" or identity:
             RefreshToken.query.filter_by(uid=int(identity), revoked=False).update({"revoked": True})
 
-        db.session.add(TokenBlocklist(jti=jti))
+        db.session.add(TokenBlocklist(jti=jti, expires_at=datetime.utcfromtimestamp(expires_at)))
 
 
         db.session.commit()
+        revoked_tokens.revoke(jti, expires_at)
 
         response = make_response(jsonify({"message": "Logged out successfully"}), 200)
         response.set_cookie('access_token_cookie', '', expires=0)
@@ -1,22 +1,30 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import selectinload
 from app import db
 from app.models.NCAAA_Courses.NCAAA_Course import NCAAA_Course
 from app.models.User import User
+from app.models.Quiz import Quiz
 from app.services.utils import admin_required
+from app.services.catalog import catalog_response, catalog_page, wants_page
+from app.services.transcript import get_transcript
+from app.services.quiz_rank import get_student_rank
+from app.services.extenstions import single_flight
 
 courses_bp = Blueprint('courses', __name__)
 
 @courses_bp.route('/courses', methods=['GET'])
+@single_flight.coalesce('courses')
 def get_courses():
     try:
-        courses = NCAAA_Course.query.all()
-        courses_data = [course.to_dict() for course in courses]
+        if wants_page(request.args):
+            return jsonify(catalog_page(request.args)), 200
+        return catalog_response()
+    except ValueError as e:
         return jsonify({
-            'success': True,
-            'courses': courses_data,
-            'total': len(courses_data)
-        }), 200
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -25,7 +33,7 @@ def get_courses():
 
 @courses_bp.route('/user/courses/<int:uid>', methods=['GET'])
 def get_my_courses(uid):
-    user = User.query.get(int(uid))
+    user = User.query.options(selectinload(User.courses)).filter_by(uid=int(uid)).first()
 
     if not user:
         return jsonify({
@@ -45,4 +53,47 @@ def get_my_courses(uid):
         'success' : True,
         'courses': courses_data,
         'total': len(courses_data)
-    }), 200
\ No newline at end of file
+    }), 200
+
+@courses_bp.route('/me/grades', methods=['GET'])
+@jwt_required()
+def get_my_grades():
+    try:
+        courses = get_transcript(int(get_jwt_identity()))
+        return jsonify({
+            'success': True,
+            'courses': courses,
+            'total': len(courses)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@courses_bp.route('/courses/<int:course_id>/quizzes/<int:quiz_id>/rank', methods=['GET'])
+@jwt_required()
+def get_my_quiz_rank(course_id, quiz_id):
+    try:
+        quiz = db.session.get(Quiz, quiz_id)
+        if quiz is None or quiz.course_id != course_id:
+            return jsonify({'success': False, 'error': 'Quiz not found'}), 404
+
+        rank = get_student_rank(quiz_id, int(get_jwt_identity()))
+        if rank is None:
+            return jsonify({'success': False, 'error': 'No mark recorded for this quiz'}), 404
+
+        return jsonify({
+            'success': True,
+            'quiz_id': quiz_id,
+            'title': quiz.title,
+            'score': rank['score'],
+            'rank': rank['rank'],
+            'percentile': rank['percentile'],
+            'total': rank['total']
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
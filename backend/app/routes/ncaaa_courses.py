@@ -3,22 +3,61 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.NCAAA_Courses.NCAAA_Course import NCAAA_Course
 from app.services.utils import admin_required
+from app.services.catalog import catalog_response, catalog_page, wants_page
+from app.services.search import catalog_search
+from app.services.extenstions import single_flight
 
 ncaaa_courses_bp = Blueprint('ncaa_courses', __name__)
 
 @ncaaa_courses_bp.route('/ncaaa', methods=['GET'])
+@single_flight.coalesce('ncaaa')
 def get_courses():
     try:
-        courses = NCAAA_Course.query.all()
-        courses_data = [course.to_dict() for course in courses]
+        if wants_page(request.args):
+            return jsonify(catalog_page(request.args)), 200
+        return catalog_response()
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@ncaaa_courses_bp.route('/ncaaa/search', methods=['GET'])
+def search_courses():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({
+            'success': False,
+            'error': 'q is required'
+        }), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'limit must be an integer'
+        }), 400
+
+    try:
+        total, courses, truncated = catalog_search.search(query, limit)
         return jsonify({
             'success': True,
-            'courses': courses_data,
-            'total': len(courses_data)
+            'query': query,
+            'courses': courses,
+            'total': total,
+            # a broad word or short prefix matched more courses than are scored; total is a lower bound, refine the query
+            'truncated': truncated
         }), 200
-        
+
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
@@ -0,0 +1,480 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask.json.tag import TaggedJSONSerializer
+
+logger = logging.getLogger(__name__)
+
+# JSON that round-trips bytes, tuples and datetimes; unlike pickle, reading an entry back never runs code
+serializer = TaggedJSONSerializer()
+
+
+class LRUBackend:
+    # per-process store, every gunicorn worker keeps its own copy of the entries. Counters are
+    # only per-process too unless `counters` is given, e.g. a SQLiteBackend shared by the workers
+    def __init__(self, max_entries=256, counters=None):
+        self.max_entries = max_entries
+        self.counters = counters
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value, expires_at=None):
+        # expiry is left to the caller's read check, max_entries already bounds the store
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def get_counter(self, key):
+        if self.counters is not None:
+            return self.counters.get_counter(key)
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr_counter(self, key):
+        if self.counters is not None:
+            return self.counters.incr_counter(key)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counters(self, keys):
+        if self.counters is not None:
+            return self.counters.get_counters(keys)
+        with self._lock:
+            return {key: self._counters.get(key, 0) for key in keys}
+
+    def incr_counters(self, keys):
+        if self.counters is not None:
+            return self.counters.incr_counters(keys)
+        with self._lock:
+            for key in keys:
+                self._counters[key] = self._counters.get(key, 0) + 1
+
+
+class SQLiteBackend:
+    # file backed store shared by every worker on the host, no external service needed. Every
+    # PRUNE_EVERY writes a worker deletes expired rows and, past max_entries, the oldest ones under
+    # its prefix, so the table can run over by that many rows per worker between prunes
+    PRUNE_EVERY = 100
+
+    def __init__(self, path, max_entries=None, prefix=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self._writes = 0
+        self._local = threading.local()
+
+    def _conn(self):
+        # connections must not cross a fork, so they are keyed by pid as well as thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # cache_entries held pickles, which must never be loaded again
+            conn.execute('DROP TABLE IF EXISTS cache_entries')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_items '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, stored_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_items_expires_at ON cache_items (expires_at)')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute('SELECT value FROM cache_items WHERE key = ?', (key,)).fetchone()
+        return serializer.loads(row[0]) if row else None
+
+    def set(self, key, value, expires_at=None):
+        self._conn().execute(
+            'INSERT OR REPLACE INTO cache_items (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)',
+            (key, serializer.dumps(value), expires_at, time.time())
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 1:
+            self.prune()
+
+    def prune(self):
+        conn = self._conn()
+        conn.execute('DELETE FROM cache_items WHERE expires_at < ?', (time.time(),))
+        if self.max_entries and self.prefix:
+            # the newest max_entries rows under our prefix stay; the prefix range is read off the primary key
+            conn.execute(
+                'DELETE FROM cache_items WHERE key IN ('
+                'SELECT key FROM cache_items WHERE key >= ? AND key < ? '
+                'ORDER BY stored_at DESC LIMIT -1 OFFSET ?)',
+                (self.prefix, self.prefix[:-1] + chr(ord(self.prefix[-1]) + 1), self.max_entries)
+            )
+
+    def delete(self, keys):
+        self._conn().executemany('DELETE FROM cache_items WHERE key = ?', [(key,) for key in keys])
+
+    def delete_prefix(self, prefix):
+        self._conn().execute('DELETE FROM cache_items WHERE substr(key, 1, ?) = ?', (len(prefix), prefix))
+
+    def get_counter(self, key):
+        row = self._conn().execute('SELECT value FROM cache_counters WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0
+
+    def incr_counter(self, key):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT INTO cache_counters (key, value) VALUES (?, 1) '
+                'ON CONFLICT(key) DO UPDATE SET value = value + 1',
+                (key,)
+            )
+            value = conn.execute('SELECT value FROM cache_counters WHERE key = ?', (key,)).fetchone()[0]
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return value
+
+    def get_counters(self, keys):
+        keys = list(keys)
+        counters = dict.fromkeys(keys, 0)
+        # in chunks, invalidate() reads a counter for every key an import touched
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            counters.update(self._conn().execute(
+                f'SELECT key, value FROM cache_counters WHERE key IN ({placeholders})', chunk
+            ))
+        return counters
+
+    def incr_counters(self, keys):
+        # one transaction for the lot, an import can invalidate thousands of keys
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT INTO cache_counters (key, value) VALUES (?, 1) '
+                'ON CONFLICT(key) DO UPDATE SET value = value + 1',
+                [(key,) for key in keys]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+
+def make_backend(app, max_entries=None, namespace=None):
+    backend = app.config['CACHE_BACKEND']
+    max_entries = max_entries or app.config['CACHE_MAX_ENTRIES']
+    path = app.config['CACHE_PATH']
+    if not path:
+        # the instance folder belongs to the app, unlike a fixed name in the shared temp dir
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = os.path.join(app.instance_path, 'cache.sqlite3')
+    if backend == 'memory':
+        # entries stay in the worker, but version counters live in the shared file so that
+        # a bump() in the worker that handled a write invalidates every other worker too
+        return LRUBackend(max_entries=max_entries, counters=SQLiteBackend(path))
+    if backend == 'sqlite':
+        return SQLiteBackend(path, max_entries=max_entries, prefix=f'{namespace}:' if namespace else None)
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}'")
+
+
+def fill(cache, full_key, lookup, load):
+    # only a shared backend lets a worker use what another one loaded, so only then is it worth waiting for
+    if cache.flight is None or not isinstance(cache.backend, SQLiteBackend):
+        return load()
+    return cache.flight.fill(f'cache:{cache.namespace}', full_key, lookup, load)
+
+
+class VersionedCache:
+    """Cache whose entries are keyed by a version counter.
+
+    Writers call bump() after committing, which moves every reader onto a new
+    key space; entries from older versions are dropped and never served again.
+    invalidate() does the same for single keys through per-key counters and
+    deletes the entries it superseded.
+    Counters are shared by every worker on the host whichever backend holds
+    the entries. Entries also expire after CACHE_TTL seconds (0 keeps them
+    until the next bump), as a backstop for writes that never bump. With a
+    SingleFlight as `flight` and the sqlite backend, workers that miss the
+    same key at once load it only once between them.
+    """
+
+    def __init__(self, namespace, app=None, max_entries=None, flight=None):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.flight = flight
+        self.backend = None
+        self.ttl = 0
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'memory')
+        app.config.setdefault('CACHE_PATH', None)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 256)
+        app.config.setdefault('CACHE_TTL', 300)
+        self.backend = make_backend(app, self.max_entries, self.namespace)
+        self.ttl = app.config['CACHE_TTL']
+        app.extensions[f'cache:{self.namespace}'] = self
+
+    def version(self):
+        return self.backend.get_counter(f'{self.namespace}:version')
+
+    def get_or_set(self, key, loader):
+        # the versions are read before loading so a concurrent bump can only orphan our entry
+        version_key, key_version_key = f'{self.namespace}:version', f'{self.namespace}:{key}:version'
+        versions = self.backend.get_counters([version_key, key_version_key])
+        full_key = f'{self.namespace}:{versions[version_key]}:{key}:{versions[key_version_key]}'
+        entry = self._fresh(full_key)
+        if entry is not None:
+            self._record(hit=True)
+            return entry[1]
+
+        self._record(hit=False)
+
+        def load():
+            # wall clock, not monotonic, since the sqlite backend is shared between processes
+            entry = (time.time() + self.ttl if self.ttl else None, loader())
+            self.backend.set(full_key, entry, expires_at=entry[0])
+            return entry
+
+        return fill(self, full_key, lambda: self._fresh(full_key), load)[1]
+
+    def _fresh(self, full_key):
+        entry = self.backend.get(full_key)
+        if entry is not None and (entry[0] is None or entry[0] > time.time()):
+            return entry
+        return None
+
+    def invalidate(self, *keys):
+        if not keys:
+            return
+        version_key = f'{self.namespace}:version'
+        key_version_keys = [f'{self.namespace}:{key}:version' for key in keys]
+        versions = self.backend.get_counters([version_key, *key_version_keys])
+        self.backend.incr_counters(key_version_keys)
+        # the superseded entries can never be read again, so they go now instead of waiting for the TTL or a prune;
+        # deleted after the bump so a reader cannot fill them again in between
+        self.backend.delete([
+            f'{self.namespace}:{versions[version_key]}:{key}:{versions[key_version_key]}'
+            for key, key_version_key in zip(keys, key_version_keys)
+        ])
+
+    def bump(self):
+        version = self.backend.incr_counter(f'{self.namespace}:version')
+        self.backend.delete_prefix(f'{self.namespace}:')
+        return version
+
+    def _record(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        return {
+            'namespace': self.namespace,
+            'backend': type(self.backend).__name__,
+            'version': self.version(),
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class StaleWhileRevalidateCache:
+    """Cache for slow or unreliable upstreams, keyed by time instead of version.
+
+    Entries younger than <prefix>_TTL seconds are served as is. Older ones
+    are still served while a background thread reloads them, and past
+    <prefix>_MAX_STALE seconds the reload happens inline. A failed reload
+    never removes an entry, so the last good value keeps being served
+    while the upstream is down. Inline reloads go through `flight` like
+    VersionedCache's.
+    """
+
+    def __init__(self, namespace, config_prefix, app=None, max_entries=None, flight=None):
+        self.namespace = namespace
+        self.config_prefix = config_prefix
+        self.max_entries = max_entries
+        self.flight = flight
+        self.app = None
+        self.backend = None
+        self.ttl = 0
+        self.max_stale = 0
+        self.counts = {'hit': 0, 'stale': 0, 'miss': 0, 'error': 0}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'memory')
+        app.config.setdefault('CACHE_PATH', None)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 256)
+        app.config.setdefault(f'{self.config_prefix}_TTL', 3600)
+        app.config.setdefault(f'{self.config_prefix}_MAX_STALE', 7 * 24 * 3600)
+        self.app = app
+        self.backend = make_backend(app, self.max_entries, self.namespace)
+        self.ttl = app.config[f'{self.config_prefix}_TTL']
+        self.max_stale = app.config[f'{self.config_prefix}_MAX_STALE']
+        # the counts describe this backend, so they start over with it
+        with self._lock:
+            self.counts = dict.fromkeys(self.counts, 0)
+        app.extensions[f'cache:{self.namespace}'] = self
+
+    def get(self, key, loader):
+        """Return (value, state) where state is 'hit', 'stale' or 'miss'.
+
+        Raises whatever the loader raised only when there is no earlier value to fall back on.
+        """
+        full_key = f'{self.namespace}:{key}'
+        # wall clock, not monotonic, since the sqlite backend is shared between processes
+        entry = self.backend.get(full_key)
+        age = time.time() - entry[0] if entry is not None else None
+
+        if age is not None and age < self.ttl:
+            self._record('hit')
+            return entry[1], 'hit'
+        if age is not None and age < self.max_stale:
+            self._record('stale')
+            self._refresh_in_background(full_key, lambda: {full_key: loader()})
+            return entry[1], 'stale'
+
+        def load():
+            loaded = (time.time(), loader())
+            self.backend.set(full_key, loaded)
+            return loaded
+
+        try:
+            loaded = fill(self, full_key, lambda: self._fresh(full_key), load)
+        except Exception as e:
+            self._record('error')
+            if entry is None:
+                raise
+            logger.warning('Reloading %s failed (%s), serving the copy from %.0fs ago', full_key, e, age)
+            return entry[1], 'stale'
+        self._record('miss')
+        return loaded[1], 'miss'
+
+    def _fresh(self, full_key):
+        entry = self.backend.get(full_key)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            return entry
+        return None
+
+    def get_many(self, keys, loader):
+        """get() for several keys, loading the missing and expired ones with a single loader(keys) call.
+
+        The loader returns {key: value} for the keys it found; keys it leaves out are
+        left out of the result too. Returns ({key: value}, state), state being the
+        worst of the keys' states.
+        """
+        now = time.time()
+        values, stale, reload, fallback = {}, [], [], {}
+        for key in keys:
+            entry = self.backend.get(f'{self.namespace}:{key}')
+            age = now - entry[0] if entry is not None else None
+            if age is not None and age < self.ttl:
+                self._record('hit')
+                values[key] = entry[1]
+            elif age is not None and age < self.max_stale:
+                self._record('stale')
+                values[key] = entry[1]
+                stale.append(key)
+            else:
+                reload.append(key)
+                if entry is not None:
+                    fallback[key] = entry[1]
+
+        if stale:
+            token = f'{self.namespace}:' + ','.join(str(key) for key in stale)
+            self._refresh_in_background(token, lambda: self._prefixed(loader(stale)))
+        if not reload:
+            return values, 'stale' if stale else 'hit'
+
+        try:
+            loaded = loader(reload)
+        except Exception as e:
+            self._record('error')
+            if len(fallback) < len(reload):
+                raise
+            logger.warning('Reloading %d %s entries failed (%s), serving the old copies', len(reload), self.namespace, e)
+            values.update(fallback)
+            return values, 'stale'
+        for full_key, value in self._prefixed(loaded).items():
+            self.backend.set(full_key, (time.time(), value))
+        self._record('miss')
+        values.update(loaded)
+        return values, 'miss'
+
+    def delete(self, *keys):
+        self.backend.delete([f'{self.namespace}:{key}' for key in keys])
+
+    def _prefixed(self, values):
+        return {f'{self.namespace}:{key}': value for key, value in values.items()}
+
+    def _refresh_in_background(self, token, load):
+        # one reload per key (or key set) per worker; other requests keep getting the stale copy meanwhile.
+        # `load` returns {full_key: value} for everything it reloaded
+        with self._lock:
+            if token in self._refreshing:
+                return
+            self._refreshing.add(token)
+        threading.Thread(target=self._refresh, args=(token, load), name='cache-refresh', daemon=True).start()
+
+    def _refresh(self, token, load):
+        try:
+            with self.app.app_context():
+                values = load()
+            for full_key, value in values.items():
+                self.backend.set(full_key, (time.time(), value))
+        except Exception as e:
+            self._record('error')
+            logger.warning('Background reload of %s failed (%s), keeping the last good copy', token, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(token)
+
+    def _record(self, state):
+        with self._lock:
+            self.counts[state] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            'namespace': self.namespace,
+            'backend': type(self.backend).__name__,
+            'ttl': self.ttl,
+            'max_stale': self.max_stale,
+            'refreshing': len(self._refreshing),
+            **counts,
+        }
@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+from flask import current_app, request, make_response
+from sqlalchemy import func
+from app.models.NCAAA_Courses.NCAAA_Course import NCAAA_Course
+from app.services.extenstions import db, catalog_cache
+from app.services.utils import encode_cursor, decode_cursor, parse_limit
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always served
+    brotli = None
+
+CATALOG_FIELDS = ('course_id', 'course_code', 'course_name', 'course_description', 'created_at')
+# only unique, non-null columns can be used as a keyset on their own
+CATALOG_SORTS = ('course_id', 'course_code', 'course_name')
+PAGE_ARGS = ('limit', 'cursor', 'fields', 'sort')
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def load_catalog():
+    return [course.to_dict() for course in NCAAA_Course.query.all()]
+
+
+def get_catalog():
+    return catalog_cache.get_or_set('courses', load_catalog)
+
+
+def get_catalog_total():
+    return catalog_cache.get_or_set('total', lambda: db.session.query(func.count(NCAAA_Course.course_id)).scalar())
+
+
+def parse_page_args(args):
+    limit = parse_limit(args, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    sort = args.get('sort', 'course_id')
+    descending = sort.startswith('-')
+    sort_field = sort[1:] if descending else sort
+    if sort_field not in CATALOG_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(CATALOG_SORTS)} (prefix with '-' for descending)")
+
+    fields = [f.strip() for f in args.get('fields', ','.join(CATALOG_FIELDS)).split(',') if f.strip()]
+    unknown = [f for f in fields if f not in CATALOG_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"fields must be a subset of {', '.join(CATALOG_FIELDS)}")
+
+    cursor = args.get('cursor')
+    after = decode_cursor(cursor, sort) if cursor else None
+    return limit, sort, sort_field, descending, fields, after
+
+
+def catalog_page(args):
+    limit, sort, sort_field, descending, fields, after = parse_page_args(args)
+
+    # only the requested columns (plus the keyset column) are selected
+    selected = list(dict.fromkeys(fields + [sort_field]))
+    sort_column = getattr(NCAAA_Course, sort_field)
+    query = db.session.query(*[getattr(NCAAA_Course, f) for f in selected])
+    if after is not None:
+        query = query.filter(sort_column < after if descending else sort_column > after)
+    query = query.order_by(sort_column.desc() if descending else sort_column.asc())
+    rows = query.limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    courses = [{f: row._mapping[f] for f in fields} for row in rows]
+    next_cursor = encode_cursor(sort, rows[-1]._mapping[sort_field]) if has_more else None
+
+    return {
+        'success': True,
+        'courses': courses,
+        'count': len(courses),
+        'total': get_catalog_total(),
+        'next_cursor': next_cursor,
+    }
+
+
+def wants_page(args):
+    return any(arg in args for arg in PAGE_ARGS)
+
+
+def build_catalog_snapshot():
+    # encoded and compressed once per catalog version, then served as-is to every client
+    courses = get_catalog()
+    body = current_app.json.dumps({
+        'success': True,
+        'courses': courses,
+        'total': len(courses)
+    }, separators=(',', ':')).encode('utf-8')
+
+    snapshot = {
+        'etag': hashlib.sha1(body).hexdigest(),
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        snapshot['br'] = brotli.compress(body, quality=11)
+    return snapshot
+
+
+def get_catalog_snapshot():
+    return catalog_cache.get_or_set('snapshot', build_catalog_snapshot)
+
+
+def choose_encoding(snapshot):
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in snapshot and accepted.quality(encoding) > 0:
+            return encoding
+    return 'identity'
+
+
+def catalog_response():
+    snapshot = get_catalog_snapshot()
+
+    # weak: the gzip, br and identity bodies are the same JSON but not the same bytes
+    if request.if_none_match.contains_weak(snapshot['etag']):
+        response = make_response('', 304)
+    else:
+        encoding = choose_encoding(snapshot)
+        response = make_response(snapshot[encoding], 200)
+        response.mimetype = 'application/json'
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(snapshot['etag'], weak=True)
+    response.vary.add('Accept-Encoding')
+    return response
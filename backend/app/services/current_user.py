@@ -0,0 +1,144 @@
+import threading
+import time
+from dataclasses import dataclass
+from sqlalchemy import select, event, inspect
+from sqlalchemy.orm import Session
+from app.services.cache import LRUBackend
+from app.services.extenstions import db
+
+# a change to any of these invalidates the cached snapshot; password_hash is not part of
+# the snapshot, but a password change should not leave the old session's view around either
+WATCHED_ATTRIBUTES = ('email', 'name', 'role', 'is_active', 'kauid', 'password_hash', 'courses')
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Read-only snapshot of the authenticated user, without the password hash."""
+
+    uid: int
+    kauid: int
+    email: str
+    name: str
+    role: str
+    is_active: bool
+    created_at: object
+    courses: tuple
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    def to_dict(self):
+        # same shape as User.to_dict
+        return {
+            "id": self.uid,
+            "kauid": self.kauid,
+            "email": self.email,
+            "name": self.name,
+            "role": self.role,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "courses_names": [name for _, _, name in self.courses],
+            "courses_codes": [code for _, code, _ in self.courses],
+            "course_ids": [course_id for course_id, _, _ in self.courses],
+        }
+
+
+def load_snapshot(uid):
+    from app.models.User import User
+    from app.models.Course import Course
+    from app.models.associations import student_course
+
+    # the user's columns and enrollments in one statement, no ORM objects
+    rows = db.session.execute(
+        select(
+            User.uid, User.kauid, User.email, User.name, User.role, User.is_active, User.created_at,
+            Course.course_id, Course.course_code, Course.course_name
+        )
+        .outerjoin(student_course, student_course.c.user_id == User.uid)
+        .outerjoin(Course, Course.course_id == student_course.c.course_id)
+        .where(User.uid == uid)
+    ).all()
+    if not rows:
+        return None
+
+    first = rows[0]
+    return CurrentUser(
+        uid=first.uid,
+        kauid=first.kauid,
+        email=first.email,
+        name=first.name,
+        role=first.role,
+        is_active=first.is_active,
+        created_at=first.created_at,
+        courses=tuple((row.course_id, row.course_code, row.course_name) for row in rows if row.course_id is not None),
+    )
+
+
+class CurrentUserLoader:
+    """Loads the JWT's user for flask_jwt_extended.current_user.
+
+    flask_jwt_extended calls the loader once per request and keeps the
+    result on `g`. With CURRENT_USER_CACHE_TTL > 0 snapshots are also kept
+    per worker for that many seconds; committed changes to a user's
+    profile, role, password or enrollments evict the entry in the worker
+    that made them, and other workers see them once the TTL runs out.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 0
+        self.backend = None
+        self._listening = False
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CURRENT_USER_CACHE_TTL', 15)
+        app.config.setdefault('CURRENT_USER_CACHE_SIZE', 5000)
+        self.ttl = app.config['CURRENT_USER_CACHE_TTL']
+        self.backend = LRUBackend(max_entries=app.config['CURRENT_USER_CACHE_SIZE'])
+        app.extensions['current_user_loader'] = self
+        with self._lock:
+            if not self._listening:
+                event.listen(Session, 'before_flush', self._collect_changes)
+                event.listen(Session, 'after_commit', self._evict_changed)
+                event.listen(Session, 'after_rollback', self._forget_changes)
+                self._listening = True
+
+    def load(self, uid):
+        if not self.ttl:
+            return load_snapshot(uid)
+
+        cached = self.backend.get(uid)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        user = load_snapshot(uid)
+        if user is not None:
+            self.backend.set(uid, (time.monotonic() + self.ttl, user))
+        return user
+
+    def invalidate(self, *uids):
+        # for writers that bypass the ORM, e.g. Core inserts into student_course
+        self.backend.delete(uids)
+
+    def _collect_changes(self, session, flush_context, instances):
+        from app.models.User import User
+        from app.models.Course import Course
+
+        stale = session.info.setdefault('stale_user_ids', set())
+        for obj in list(session.dirty) + list(session.deleted):
+            if isinstance(obj, User) and obj.uid is not None:
+                state = inspect(obj)
+                if obj in session.deleted or any(state.attrs[name].history.has_changes() for name in WATCHED_ATTRIBUTES):
+                    stale.add(obj.uid)
+            elif isinstance(obj, Course):
+                history = inspect(obj).attrs.students.history
+                stale.update(user.uid for user in [*history.added, *history.deleted] if user.uid is not None)
+
+    def _evict_changed(self, session):
+        stale = session.info.pop('stale_user_ids', None)
+        if stale:
+            self.invalidate(*stale)
+
+    def _forget_changes(self, session):
+        session.info.pop('stale_user_ids', None)
@@ -1,5 +1,6 @@
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from app.services import rate_limit_storage  # noqa: F401, registers the sqlite:// storage scheme with limits
 
 limiter = Limiter(key_func=get_remote_address)
 
@@ -12,4 +13,45 @@ from flask_jwt_extended import JWTManager
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
-jwt = JWTManager()
\ No newline at end of file
+jwt = JWTManager()
+
+from app.services.passwords import PasswordHasher
+
+password_hasher = PasswordHasher()
+
+
+from app.services.single_flight import SingleFlight
+
+single_flight = SingleFlight()
+
+
+from app.services.cache import VersionedCache, StaleWhileRevalidateCache
+
+catalog_cache = VersionedCache('ncaaa_catalog', flight=single_flight)
+grades_cache = VersionedCache('student_grades', max_entries=20000, flight=single_flight)
+rank_cache = VersionedCache('quiz_ranks', max_entries=2000, flight=single_flight)
+orcid_cache = StaleWhileRevalidateCache('orcid', 'ORCID_CACHE', max_entries=500, flight=single_flight)
+
+from app.services.jobs import JobRunner
+
+job_runner = JobRunner()
+
+from app.services.revocation import RevokedTokens
+
+revoked_tokens = RevokedTokens()
+
+from app.services.token_purge import TokenPurgeSchedule
+
+token_purge_schedule = TokenPurgeSchedule()
+
+from app.services.current_user import CurrentUserLoader
+
+current_user_loader = CurrentUserLoader()
+
+from app.services.http_client import HttpClient
+
+orcid_client = HttpClient('orcid', 'ORCID_HTTP')
+
+from app.services.orcid_sync import OrcidSyncSchedule
+
+orcid_sync_schedule = OrcidSyncSchedule()
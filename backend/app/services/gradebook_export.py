@@ -0,0 +1,125 @@
+import csv
+import io
+import zipfile
+from xml.sax.saxutils import escape
+from app.services.gradebook_matrix import load_gradebook_columns, iter_gradebook_blocks
+from app.services.gradebook_import import KAUID_COLUMN
+
+STREAM_BATCH_SIZE = 1000
+
+
+def format_scores(values):
+    # shortest text that reads back as the same double, so 3.3 stays "3.3" and whole marks drop the ".0"
+    return [None if text == "nan" else text[:-2] if text.endswith(".0") else text for text in values.astype(str)]
+
+
+def iter_gradebook_rows(blocks):
+    """Yield one [kauid, score, ...] row per student in the layout upload_csv accepts."""
+    for matrix in blocks:
+        for kauid, scores in zip(matrix.kauids, matrix.scores):
+            if kauid:
+                yield [int(kauid)] + format_scores(scores)
+
+
+def iter_gradebook(course_id, writer):
+    # one block of students at a time, so a large course is never held in memory whole
+    quiz_ids, titles = load_gradebook_columns(course_id)
+    blocks = iter_gradebook_blocks(course_id, quiz_ids, titles)
+    yield from writer([KAUID_COLUMN] + titles, iter_gradebook_rows(blocks))
+
+
+def iter_csv(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(["" if value is None else value for value in row])
+        if i % STREAM_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+class StreamSink(io.RawIOBase):
+    # write-only, unseekable target for zipfile; drained by the generator after every batch
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Gradebook" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def xlsx_row(values, numeric):
+    cells = []
+    for value in values:
+        if value is None:
+            cells.append("<c/>")
+        elif numeric:
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>".encode("utf-8")
+
+
+def iter_xlsx(header, rows):
+    """Stream a single-sheet workbook without holding it in memory or on disk."""
+    sink = StreamSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        yield sink.drain()
+
+        with workbook.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(xlsx_row(header, numeric=False))
+            for i, row in enumerate(rows, start=1):
+                sheet.write(xlsx_row(row, numeric=True))
+                if i % STREAM_BATCH_SIZE == 0:
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
@@ -0,0 +1,168 @@
+import csv
+import io
+import math
+from sqlalchemy import insert
+from app.models.User import User
+from app.models.Quiz import Quiz
+from app.models.QuizMark import QuizMark
+from flask import current_app
+from app.services.extenstions import db, job_runner, grades_cache
+from app.services.upsert import bulk_upsert
+from app.services.gradebook_summary import refresh_student_summaries, refresh_quiz_summaries
+from app.services.transcript import invalidate_transcripts
+from app.services.quiz_rank import invalidate_leaderboards
+
+KAUID_COLUMN = "KAUID"
+
+
+def open_csv(stream):
+    # wraps the upload so rows are decoded and parsed as they are read, never all at once
+    return csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+
+
+def chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ensure_quizzes(course_id, titles):
+    existing = dict(db.session.query(Quiz.title, Quiz.quiz_id).filter(Quiz.course_id == course_id))
+    missing = [title for title in titles if title not in existing]
+    if missing:
+        db.session.execute(insert(Quiz), [{"title": title, "course_id": course_id} for title in missing])
+        existing = dict(db.session.query(Quiz.title, Quiz.quiz_id).filter(Quiz.course_id == course_id))
+    return {title: existing[title] for title in titles}, len(missing)
+
+
+def resolve_kauids(kauids):
+    if not kauids:
+        return {}
+    return dict(db.session.query(User.kauid, User.uid).filter(User.kauid.in_(kauids)))
+
+
+def existing_scores(marks):
+    # one lookup per batch, used to split the batch into inserts, updates and no-ops
+    pairs = {(mark["user_id"], mark["quiz_id"]) for mark in marks}
+    if not pairs:
+        return {}
+    rows = db.session.query(QuizMark.user_id, QuizMark.quiz_id, QuizMark.score).filter(
+        QuizMark.user_id.in_({user_id for user_id, _ in pairs}),
+        QuizMark.quiz_id.in_({quiz_id for _, quiz_id in pairs})
+    )
+    return {(user_id, quiz_id): score for user_id, quiz_id, score in rows if (user_id, quiz_id) in pairs}
+
+
+def upsert_marks(marks):
+    bulk_upsert(QuizMark.__table__, marks, ["user_id", "quiz_id"])
+
+
+def write_marks(marks, stats):
+    current = existing_scores(marks)
+    pending = []
+    for mark in marks:
+        score = current.get((mark["user_id"], mark["quiz_id"]))
+        if score is None:
+            stats["inserted"] += 1
+        # exact: quiz_marks.score is a DOUBLE, so a stored score reads back as the float it was parsed to
+        elif score == mark["score"]:
+            stats["unchanged"] += 1
+            continue
+        else:
+            stats["updated"] += 1
+        pending.append(mark)
+    upsert_marks(pending)
+    return pending
+
+
+def parse_kauid(value):
+    try:
+        return int(value.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def import_gradebook(course_id, stream, batch_size=1000, progress=None):
+    reader = open_csv(stream)
+    header = next(reader, None)
+    if not header or KAUID_COLUMN not in header:
+        raise ValueError(f"CSV must have a {KAUID_COLUMN} column")
+
+    kauid_index = header.index(KAUID_COLUMN)
+    quiz_columns = [(i, title.strip()) for i, title in enumerate(header) if i != kauid_index and title.strip()]
+    quiz_ids, quizzes_created = ensure_quizzes(course_id, list(dict.fromkeys(title for _, title in quiz_columns)))
+
+    stats = {
+        "rows": 0,
+        "inserted": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "quizzes_created": quizzes_created,
+        "unknown_kauids": 0,
+        "invalid_scores": 0,
+    }
+
+    for rows in chunks(reader, batch_size):
+        kauids = [parse_kauid(row[kauid_index]) if len(row) > kauid_index else None for row in rows]
+        users = resolve_kauids({k for k in kauids if k is not None})
+
+        # a later cell for the same student and quiz wins, as it would on re-upload
+        marks = {}
+        for kauid, row in zip(kauids, rows):
+            stats["rows"] += 1
+            user_id = users.get(kauid)
+            if user_id is None:
+                stats["unknown_kauids"] += 1
+                continue
+
+            for i, title in quiz_columns:
+                cell = row[i].strip() if i < len(row) else ""
+                if not cell:
+                    continue
+                try:
+                    score = float(cell)
+                except ValueError:
+                    score = None
+                # float() also takes "nan" and "inf", which no mark can be
+                if score is None or not math.isfinite(score):
+                    stats["invalid_scores"] += 1
+                    continue
+                marks[(user_id, quiz_ids[title])] = {"user_id": user_id, "quiz_id": quiz_ids[title], "score": score}
+
+        # both summaries are refreshed with the batch, so they are committed with its marks
+        touched_students, touched_quizzes = set(), set()
+        for batch in chunks(marks.values(), batch_size):
+            for mark in write_marks(batch, stats):
+                touched_students.add(mark["user_id"])
+                touched_quizzes.add(mark["quiz_id"])
+        refresh_student_summaries(course_id, touched_students)
+        refresh_quiz_summaries(course_id, touched_quizzes)
+
+        if progress is not None:
+            progress(stats)
+        # after the progress commit, so a reader cannot re-cache the old marks or ranks
+        invalidate_transcripts(touched_students)
+        invalidate_leaderboards(touched_quizzes)
+
+    if quizzes_created:
+        # new quizzes show up in every enrolled student's transcript
+        grades_cache.bump()
+    return stats
+
+
+@job_runner.handler("gradebook_import")
+def run_import_job(job, report_progress):
+    # each batch is committed with its progress update; a job re-run after its worker died
+    # starts from the top again, which the upserts make safe
+    with open(job.file_path, "rb") as upload:
+        return import_gradebook(
+            job.course_id,
+            upload,
+            current_app.config["GRADEBOOK_BATCH_SIZE"],
+            progress=lambda stats: report_progress(stats["rows"], upload.tell())
+        )
@@ -0,0 +1,110 @@
+import itertools
+import numpy as np
+from sqlalchemy import select, func
+from app.models.User import User
+from app.models.Quiz import Quiz
+from app.models.QuizMark import QuizMark
+from app.services.extenstions import db
+
+LOAD_BATCH_SIZE = 10000
+
+
+class GradebookMatrix:
+    """Dense students x quizzes score matrix for one course.
+
+    Scores are float32, ample for marks, with NaN for a missing mark, so a
+    course costs four bytes per cell instead of an ORM object per mark. Rows follow `uids` in ascending order and columns follow
+    `quiz_ids`; `kauids` is 0 for students without one. Export blocks keep
+    the stored float64 scores instead, so they are written back unchanged.
+    """
+
+    def __init__(self, uids, kauids, quiz_ids, titles, scores):
+        self.uids = uids
+        self.kauids = kauids
+        self.quiz_ids = quiz_ids
+        self.titles = titles
+        self.scores = scores
+
+    @property
+    def shape(self):
+        return self.scores.shape
+
+    @property
+    def nbytes(self):
+        return self.uids.nbytes + self.kauids.nbytes + self.quiz_ids.nbytes + self.scores.nbytes
+
+    def row_of(self, uid):
+        i = np.searchsorted(self.uids, uid)
+        return int(i) if i < len(self.uids) and self.uids[i] == uid else None
+
+    def column_of(self, quiz_id):
+        j = np.searchsorted(self.quiz_ids, quiz_id)
+        return int(j) if j < len(self.quiz_ids) and self.quiz_ids[j] == quiz_id else None
+
+    def marks(self):
+        # flat (column, score) pairs for every recorded mark, in float64 for the statistics code
+        present = ~np.isnan(self.scores)
+        return np.nonzero(present)[1], self.scores[present].astype(np.float64)
+
+
+def load_gradebook_columns(course_id):
+    quizzes = db.session.query(Quiz.quiz_id, Quiz.title).filter(Quiz.course_id == course_id).order_by(Quiz.quiz_id).all()
+    return np.array([quiz_id for quiz_id, _ in quizzes], dtype=np.int64), [title for _, title in quizzes]
+
+
+def marks_query(course_id):
+    return (
+        select(QuizMark.user_id, func.coalesce(User.kauid, 0), QuizMark.quiz_id, QuizMark.score)
+        .join(User, User.uid == QuizMark.user_id)
+        .join(Quiz, Quiz.quiz_id == QuizMark.quiz_id)
+        .where(Quiz.course_id == course_id)
+    )
+
+
+def to_flat(rows):
+    # fromiter over the flattened rows is far cheaper than np.array on Row objects
+    return np.fromiter(itertools.chain.from_iterable(rows), dtype=np.float64, count=4 * len(rows)).reshape(-1, 4)
+
+
+def build_matrix(flat, quiz_ids, titles, dtype=np.float32):
+    uids, first, rows = np.unique(flat[:, 0].astype(np.int64), return_index=True, return_inverse=True)
+    scores = np.full((len(uids), len(quiz_ids)), np.nan, dtype=dtype)
+    scores[rows, np.searchsorted(quiz_ids, flat[:, 2])] = flat[:, 3]
+    return GradebookMatrix(uids, flat[first, 1].astype(np.int64), quiz_ids, titles, scores)
+
+
+def load_gradebook_matrix(course_id):
+    quiz_ids, titles = load_gradebook_columns(course_id)
+
+    # every mark of the course in one streamed query, converted a partition at a time
+    result = db.session.execute(
+        marks_query(course_id),
+        execution_options={"stream_results": True, "yield_per": LOAD_BATCH_SIZE}
+    )
+    parts = [to_flat(rows) for rows in result.partitions()]
+    flat = np.concatenate(parts) if parts else np.empty((0, 4))
+    return build_matrix(flat, quiz_ids, titles)
+
+
+def iter_gradebook_blocks(course_id, quiz_ids, titles, batch_size=LOAD_BATCH_SIZE):
+    """Yield the course as consecutive GradebookMatrix blocks of students, in uid order.
+
+    Marks are read through one server-side cursor ordered by student, so only
+    about `batch_size` marks are held at a time. The last student of a
+    partition may continue in the next one and is carried over to it rather
+    than split across two blocks. Blocks hold float64 scores, the stored
+    precision, since only one block is alive at a time.
+    """
+    result = db.session.execute(
+        marks_query(course_id).order_by(QuizMark.user_id),
+        execution_options={"stream_results": True, "yield_per": batch_size}
+    )
+    carry = np.empty((0, 4))
+    for rows in result.partitions():
+        flat = np.concatenate([carry, to_flat(rows)])
+        split = np.searchsorted(flat[:, 0], flat[-1, 0])
+        carry = flat[split:]
+        if split:
+            yield build_matrix(flat[:split], quiz_ids, titles, np.float64)
+    if len(carry):
+        yield build_matrix(carry, quiz_ids, titles, np.float64)
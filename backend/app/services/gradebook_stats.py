@@ -0,0 +1,122 @@
+import numpy as np
+from app.services.gradebook_matrix import load_gradebook_matrix
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def group_stats(groups, scores, bins, low, high, pass_mark):
+    """Per-group descriptive statistics without a Python loop over marks.
+
+    Counts, sums, pass counts and histograms are bincounts over dense group
+    numbers. Order statistics come from one integer sort of (group, score rank)
+    keys; the ranks index the distinct scores, so fractional marks come back
+    exactly, and it is about three times cheaper than a lexsort.
+    """
+    # group ids are small non-negative integers (matrix columns), so densify them with a bincount, not np.unique
+    present = np.bincount(groups) > 0
+    keys = np.flatnonzero(present)
+    dense = (np.cumsum(present) - 1)[groups]
+    size = len(keys)
+
+    counts = np.bincount(dense, minlength=size)
+    sums = np.bincount(dense, weights=scores, minlength=size)
+    squares = np.bincount(dense, weights=scores * scores, minlength=size)
+    passed = np.bincount(dense, weights=(scores >= pass_mark).astype(np.float64), minlength=size)
+
+    width = (high - low) / bins if high > low else 1.0
+    bin_index = np.clip(((scores - low) / width).astype(np.int64), 0, bins - 1)
+    histograms = np.bincount(dense * bins + bin_index, minlength=size * bins).reshape(size, bins)
+
+    # rank scores among their distinct values so the combined key stays an exact integer
+    distinct, rank = np.unique(scores, return_inverse=True)
+    combined = np.sort(dense.astype(np.int64) * len(distinct) + rank.ravel())
+    ordered = distinct[combined % len(distinct)]
+
+    return summarize(keys, counts, sums, squares, passed, histograms, ordered)
+
+
+def total_stats(per_group, scores):
+    # course-wide figures are sums of the per-group ones; only the order statistics need a fresh sort
+    return summarize(
+        np.zeros(1, dtype=np.int64),
+        per_group["count"].sum(keepdims=True),
+        per_group["sum"].sum(keepdims=True),
+        per_group["sum_squares"].sum(keepdims=True),
+        per_group["passed"].sum(keepdims=True),
+        per_group["histogram"].sum(axis=0, keepdims=True),
+        np.sort(scores)
+    )
+
+
+def summarize(keys, counts, sums, squares, passed, histograms, ordered):
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    means = sums / counts
+    variances = np.maximum(squares / counts - means * means, 0.0)
+
+    # linear interpolation between closest ranks, the numpy default
+    positions = starts[:, None] + (counts[:, None] - 1) * (np.array(PERCENTILES) / 100.0)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    percentiles = ordered[lower] + (ordered[upper] - ordered[lower]) * (positions - lower)
+
+    return {
+        "keys": keys,
+        "count": counts,
+        "sum": sums,
+        "sum_squares": squares,
+        "passed": passed,
+        "mean": means,
+        "std": np.sqrt(variances),
+        "min": ordered[starts],
+        "max": ordered[starts + counts - 1],
+        "percentiles": percentiles,
+        "histogram": histograms,
+        "pass_rate": passed / counts,
+    }
+
+
+def stats_row(stats, i):
+    percentiles = {f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, stats["percentiles"][i])}
+    return {
+        "count": int(stats["count"][i]),
+        "mean": round(float(stats["mean"][i]), 4),
+        "median": percentiles["p50"],
+        "std": round(float(stats["std"][i]), 4),
+        "min": round(float(stats["min"][i]), 4),
+        "max": round(float(stats["max"][i]), 4),
+        "percentiles": percentiles,
+        "histogram": stats["histogram"][i].tolist(),
+        "pass_rate": round(float(stats["pass_rate"][i]), 4),
+    }
+
+
+def course_stats(course_id, bins=10, max_score=None, pass_mark=None):
+    matrix = load_gradebook_matrix(course_id)
+    columns, scores = matrix.marks()
+    quizzes = list(zip(matrix.quiz_ids.tolist(), matrix.titles))
+
+    high = float(max_score) if max_score is not None else (float(scores.max()) if scores.size else 0.0)
+    pass_mark = float(pass_mark) if pass_mark is not None else high / 2
+    histogram = {"bins": bins, "min": 0.0, "max": high, "edges": np.linspace(0.0, high, bins + 1).round(4).tolist()}
+
+    if not scores.size:
+        return {
+            "histogram": histogram,
+            "pass_mark": pass_mark,
+            "course": {"count": 0},
+            "quizzes": [{"quiz_id": quiz_id, "title": title, "count": 0} for quiz_id, title in quizzes],
+        }
+
+    per_quiz = group_stats(columns, scores, bins, 0.0, high, pass_mark)
+    overall = total_stats(per_quiz, scores)
+    rows = {int(matrix.quiz_ids[key]): i for i, key in enumerate(per_quiz["keys"])}
+
+    return {
+        "histogram": histogram,
+        "pass_mark": pass_mark,
+        "course": stats_row(overall, 0),
+        "quizzes": [
+            {"quiz_id": quiz_id, "title": title, **(stats_row(per_quiz, rows[quiz_id]) if quiz_id in rows else {"count": 0})}
+            for quiz_id, title in quizzes
+        ],
+    }
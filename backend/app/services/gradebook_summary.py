@@ -0,0 +1,103 @@
+from datetime import datetime
+from sqlalchemy import func, delete
+from app.models.Quiz import Quiz
+from app.models.QuizMark import QuizMark
+from app.models.GradebookSummary import StudentGradeSummary, QuizGradeSummary
+from app.services.extenstions import db
+from app.services.upsert import bulk_upsert
+
+SUMMARY_BATCH_SIZE = 1000
+
+
+def aggregate(group_column, course_id, keys=None):
+    query = db.session.query(
+        Quiz.course_id,
+        group_column,
+        func.count(QuizMark.score),
+        func.sum(QuizMark.score),
+        func.sum(QuizMark.score * QuizMark.score),
+        func.min(QuizMark.score),
+        func.max(QuizMark.score)
+    ).join(Quiz, Quiz.quiz_id == QuizMark.quiz_id)
+    if course_id is not None:
+        query = query.filter(Quiz.course_id == course_id)
+    if keys is not None:
+        query = query.filter(group_column.in_(keys))
+    return query.group_by(Quiz.course_id, group_column).all()
+
+
+def summary_rows(key_name, aggregates):
+    now = datetime.utcnow()
+    return [{
+        "course_id": course_id,
+        key_name: key,
+        "mark_count": count,
+        "score_sum": float(total or 0.0),
+        "score_sum_squares": float(squares or 0.0),
+        "score_min": low,
+        "score_max": high,
+        "updated_at": now,
+    } for course_id, key, count, total, squares, low, high in aggregates]
+
+
+def refresh(model, group_column, key_name, course_id, keys):
+    # only the given keys are re-aggregated, the rest of the table is left alone
+    keys = sorted(keys)
+    key_column = getattr(model, key_name)
+    for start in range(0, len(keys), SUMMARY_BATCH_SIZE):
+        batch = keys[start:start + SUMMARY_BATCH_SIZE]
+        rows = summary_rows(key_name, aggregate(group_column, course_id, batch))
+        bulk_upsert(model.__table__, rows, ["course_id", key_name])
+        # a key with no marks left has no aggregate row, so its old summary is removed instead
+        gone = set(batch) - {row[key_name] for row in rows}
+        if gone:
+            db.session.execute(delete(model).where(model.course_id == course_id, key_column.in_(gone)))
+
+
+def refresh_student_summaries(course_id, user_ids):
+    refresh(StudentGradeSummary, QuizMark.user_id, "user_id", course_id, user_ids)
+
+
+def refresh_quiz_summaries(course_id, quiz_ids):
+    refresh(QuizGradeSummary, QuizMark.quiz_id, "quiz_id", course_id, quiz_ids)
+
+
+def rebuild_summaries(course_id=None):
+    """Recompute both summary tables from quiz_marks, for one course or all."""
+    for model, group_column, key_name in (
+        (StudentGradeSummary, QuizMark.user_id, "user_id"),
+        (QuizGradeSummary, QuizMark.quiz_id, "quiz_id"),
+    ):
+        stmt = delete(model)
+        if course_id is not None:
+            stmt = stmt.where(model.course_id == course_id)
+        db.session.execute(stmt)
+        rows = summary_rows(key_name, aggregate(group_column, course_id))
+        for start in range(0, len(rows), SUMMARY_BATCH_SIZE):
+            db.session.execute(model.__table__.insert(), rows[start:start + SUMMARY_BATCH_SIZE])
+
+
+def close(have, want):
+    # sums come back from the database in a different order than they were added
+    return abs(have - want) <= 1e-9 * max(1.0, abs(want))
+
+
+def verify_summaries(course_id=None):
+    """Compare stored summaries with a fresh aggregate, returns a list of mismatches."""
+    mismatches = []
+    for model, group_column, key_name in (
+        (StudentGradeSummary, QuizMark.user_id, "user_id"),
+        (QuizGradeSummary, QuizMark.quiz_id, "quiz_id"),
+    ):
+        expected = {(r["course_id"], r[key_name]): r for r in summary_rows(key_name, aggregate(group_column, course_id))}
+        query = model.query if course_id is None else model.query.filter_by(course_id=course_id)
+        stored = {(s.course_id, getattr(s, key_name)): s for s in query}
+
+        for key in expected.keys() | stored.keys():
+            want, have = expected.get(key), stored.get(key)
+            if want is None or have is None or have.mark_count != want["mark_count"] \
+                    or not close(have.score_sum, want["score_sum"]) \
+                    or not close(have.score_sum_squares, want["score_sum_squares"]) \
+                    or have.score_min != want["score_min"] or have.score_max != want["score_max"]:
+                mismatches.append({"table": model.__tablename__, "course_id": key[0], key_name: key[1]})
+    return mismatches
@@ -0,0 +1,203 @@
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# worth another attempt: throttling and upstream/gateway failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value):
+    # seconds, or an HTTP date
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Fails calls fast after `threshold` consecutive failures.
+
+    After `reset_timeout` seconds one trial call is let through; its
+    success closes the circuit again, its failure reopens it.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            return 'half-open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial:
+                raise CircuitOpen('Upstream circuit is open')
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+class HttpClient:
+    """Shared outbound HTTP client for one upstream.
+
+    Keeps a pooled keep-alive session per worker process, applies
+    <prefix>_CONNECT_TIMEOUT / <prefix>_READ_TIMEOUT to every call, retries
+    idempotent requests up to <prefix>_RETRIES times with full-jitter
+    backoff, or after the upstream's Retry-After when that is at most
+    <prefix>_MAX_RETRY_AFTER seconds, and puts a circuit breaker in front
+    of the upstream so an outage costs callers nothing once it has been
+    noticed.
+    """
+
+    def __init__(self, name, config_prefix, app=None):
+        self.name = name
+        self.config_prefix = config_prefix
+        self.connect_timeout = 3.05
+        self.read_timeout = 10
+        self.retries = 2
+        self.backoff = 0.25
+        self.pool_size = 10
+        self.max_retry_after = 5
+        self.breaker = CircuitBreaker()
+        self.counts = {'requests': 0, 'retries': 0, 'failures': 0, 'rejected': 0}
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        prefix = self.config_prefix
+        app.config.setdefault(f'{prefix}_CONNECT_TIMEOUT', 3.05)
+        app.config.setdefault(f'{prefix}_READ_TIMEOUT', 10)
+        app.config.setdefault(f'{prefix}_RETRIES', 2)
+        app.config.setdefault(f'{prefix}_BACKOFF', 0.25)
+        app.config.setdefault(f'{prefix}_POOL_SIZE', 10)
+        app.config.setdefault(f'{prefix}_MAX_RETRY_AFTER', 5)
+        app.config.setdefault(f'{prefix}_BREAKER_THRESHOLD', 5)
+        app.config.setdefault(f'{prefix}_BREAKER_RESET', 30)
+        self.connect_timeout = app.config[f'{prefix}_CONNECT_TIMEOUT']
+        self.read_timeout = app.config[f'{prefix}_READ_TIMEOUT']
+        self.retries = app.config[f'{prefix}_RETRIES']
+        self.backoff = app.config[f'{prefix}_BACKOFF']
+        self.pool_size = app.config[f'{prefix}_POOL_SIZE']
+        self.max_retry_after = app.config[f'{prefix}_MAX_RETRY_AFTER']
+        self.breaker = CircuitBreaker(app.config[f'{prefix}_BREAKER_THRESHOLD'], app.config[f'{prefix}_BREAKER_RESET'])
+        app.extensions[f'http_client:{self.name}'] = self
+
+    def session(self):
+        # created lazily so forked gunicorn workers never share pooled sockets
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                # retries are done here, with jitter, rather than by urllib3
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+                self._pid = os.getpid()
+            return self._session
+
+    def get(self, url, **kwargs):
+        """GET with retries. Returns the final response, whatever its status; raises
+        CircuitOpen when the upstream is known to be down and requests.RequestException
+        when no response arrived at all."""
+        try:
+            self.breaker.before_call()
+        except CircuitOpen:
+            self._count('rejected')
+            raise
+
+        # every way out reports to the breaker, or a failed half-open trial would leave it stuck
+        try:
+            response = self._get_with_retries(url, **kwargs)
+        except BaseException:
+            self._failed()
+            raise
+        if response.status_code in RETRY_STATUSES:
+            self._failed()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _get_with_retries(self, url, **kwargs):
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        for attempt in range(self.retries + 1):
+            self._count('requests')
+            last_attempt = attempt == self.retries
+            # full jitter keeps workers that failed together from retrying together
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            try:
+                response = self.session().get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt:
+                    raise
+                logger.info('%s: GET %s failed (%s), retrying', self.name, url, e)
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None:
+                    if retry_after > self.max_retry_after:
+                        # the upstream asked for a longer pause than a request can wait
+                        return response
+                    delay = max(delay, retry_after)
+                logger.info('%s: GET %s returned %s, retrying', self.name, url, response.status_code)
+                response.close()
+
+            self._count('retries')
+            time.sleep(delay)
+
+    def _failed(self):
+        self._count('failures')
+        self.breaker.record_failure()
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            'name': self.name,
+            'circuit': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            **counts,
+        }
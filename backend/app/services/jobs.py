@@ -0,0 +1,214 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_
+from app.services.extenstions import db
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobRunner:
+    """In-process worker pool for work that should not run inside a request.
+
+    Jobs live in the `jobs` table so any worker can report on them; the pool
+    that accepted a job is the one that runs it. Handlers are registered per
+    kind and receive the Job row and a progress callback.
+
+    Each worker refreshes heartbeat_at on the jobs its pool holds every
+    JOB_HEARTBEAT seconds. A queued or running job whose heartbeat is older
+    than JOB_STALE_AFTER lost its worker to a restart or crash: the first
+    worker to notice claims it and runs it again, or marks it failed once its
+    upload is gone or it has been started JOB_MAX_ATTEMPTS times. Spool files
+    no active job refers to are removed on the same pass. With workers on
+    several hosts, JOB_DIR must be shared between them.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.handlers = {}
+        self._executor = None
+        self._pid = None
+        self._held = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('JOB_WORKERS', 2)
+        app.config.setdefault('JOB_DIR', os.path.join(tempfile.gettempdir(), 'atif_courses_jobs'))
+        app.config.setdefault('JOB_HEARTBEAT', 30)
+        app.config.setdefault('JOB_STALE_AFTER', 300)
+        app.config.setdefault('JOB_MAX_ATTEMPTS', 3)
+        os.makedirs(app.config['JOB_DIR'], exist_ok=True)
+        self.app = app
+        app.extensions['job_runner'] = self
+        # started on the first request so the thread lives in the forked worker, not the master
+        app.before_request(self.ensure_started)
+
+    def handler(self, kind):
+        def register(fn):
+            self.handlers[kind] = fn
+            return fn
+        return register
+
+    def executor(self):
+        # created lazily so every forked gunicorn worker gets its own threads
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.app.config['JOB_WORKERS'],
+                    thread_name_prefix='job'
+                )
+                self._pid = os.getpid()
+                self._held = set()
+                threading.Thread(target=self._loop, name='job-heartbeat', daemon=True).start()
+            return self._executor
+
+    def ensure_started(self):
+        self.executor()
+
+    def spool(self, upload):
+        path = os.path.join(self.app.config['JOB_DIR'], f'{uuid.uuid4().hex}.upload')
+        upload.save(path)
+        return path, os.path.getsize(path)
+
+    def submit(self, job_id):
+        executor = self.executor()
+        with self._lock:
+            self._held.add(job_id)
+        return executor.submit(self._run, job_id)
+
+    def _loop(self):
+        # the first pass runs as the worker starts, so jobs lost by the previous one are picked up
+        while True:
+            with self.app.app_context():
+                try:
+                    self.heartbeat()
+                    self.recover()
+                except Exception:
+                    logger.exception('Job heartbeat failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            time.sleep(self.app.config['JOB_HEARTBEAT'])
+
+    def heartbeat(self):
+        from app.models.Job import Job
+
+        with self._lock:
+            held = list(self._held)
+        if held:
+            db.session.query(Job).filter(Job.job_id.in_(held), Job.status.in_(ACTIVE_STATUSES)).update(
+                {Job.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+            )
+            db.session.commit()
+
+    def recover(self):
+        """Re-run or fail jobs whose worker stopped heartbeating, then drop orphaned spool files."""
+        from app.models.Job import Job
+
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.app.config['JOB_STALE_AFTER'])
+        stale = and_(
+            Job.status.in_(ACTIVE_STATUSES),
+            or_(Job.heartbeat_at < cutoff, and_(Job.heartbeat_at.is_(None), Job.created_at < cutoff))
+        )
+
+        for job_id, kind, attempts, file_path in db.session.query(Job.job_id, Job.kind, Job.attempts, Job.file_path).filter(stale).all():
+            if kind not in self.handlers:
+                error = f'No handler for {kind} jobs'
+            elif (attempts or 0) >= self.app.config['JOB_MAX_ATTEMPTS']:
+                error = f'Interrupted {attempts} times, giving up'
+            elif not file_path or not os.path.exists(file_path):
+                error = 'Interrupted by a restart and its upload is gone; upload the file again'
+            else:
+                error = None
+
+            values = {Job.heartbeat_at: now}
+            if error is None:
+                values[Job.status] = 'queued'
+            else:
+                values.update({Job.status: 'failed', Job.error: error, Job.finished_at: now})
+            # the stale condition again, so of several workers noticing the same job only one claims it
+            claimed = db.session.query(Job).filter(Job.job_id == job_id, stale).update(values, synchronize_session=False)
+            db.session.commit()
+            if not claimed:
+                continue
+            if error is None:
+                logger.warning('Job %s lost its worker, running it again', job_id)
+                self.submit(job_id)
+            else:
+                logger.warning('Job %s lost its worker: %s', job_id, error)
+                if file_path and os.path.exists(file_path):
+                    os.remove(file_path)
+
+        self.remove_orphaned_files(cutoff)
+
+    def remove_orphaned_files(self, cutoff):
+        from app.models.Job import Job
+
+        job_dir = self.app.config['JOB_DIR']
+        active = {path for path, in db.session.query(Job.file_path).filter(Job.status.in_(ACTIVE_STATUSES))}
+        for name in os.listdir(job_dir):
+            path = os.path.join(job_dir, name)
+            try:
+                # young files may belong to an upload whose job row is not committed yet
+                if path not in active and datetime.utcfromtimestamp(os.path.getmtime(path)) < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _run(self, job_id):
+        from app.models.Job import Job
+
+        with self.app.app_context():
+            job = db.session.get(Job, job_id)
+            if job is None or job.status not in ACTIVE_STATUSES:
+                self._release(job_id)
+                db.session.remove()
+                return
+            try:
+                handler = self.handlers[job.kind]
+                job.status = 'running'
+                job.attempts = (job.attempts or 0) + 1
+                job.started_at = job.heartbeat_at = datetime.utcnow()
+                db.session.commit()
+
+                def progress(rows_processed, bytes_processed):
+                    job.rows_processed = rows_processed
+                    job.bytes_processed = bytes_processed
+                    job.heartbeat_at = datetime.utcnow()
+                    db.session.commit()
+
+                result = handler(job, progress)
+                job.status = 'succeeded'
+                job.result = json.dumps(result)
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+
+            except Exception as e:
+                logger.exception('Job %s failed', job_id)
+                db.session.rollback()
+                job = db.session.get(Job, job_id)
+                job.status = 'failed'
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+
+            finally:
+                self._release(job_id)
+                if job.file_path and os.path.exists(job.file_path):
+                    os.remove(job.file_path)
+                db.session.remove()
+
+    def _release(self, job_id):
+        with self._lock:
+            self._held.discard(job_id)
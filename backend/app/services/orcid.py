@@ -0,0 +1,134 @@
+import json
+import requests
+from flask import current_app
+from sqlalchemy.orm import defer
+from app.services.extenstions import db, orcid_cache, orcid_client
+from app.services.http_client import CircuitOpen
+
+HEADERS = {"Accept": "application/json"}
+# ORCID accepts at most this many put-codes in one /works/{put-codes} request
+BULK_LIMIT = 100
+
+
+class OrcidError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def orcid_url(path):
+    config = current_app.config
+    return f"{config['ORCID_API_URL']}/{config['ORCID_ID']}/{path}"
+
+
+def orcid_get(path):
+    try:
+        response = orcid_client.get(orcid_url(path), headers=HEADERS)
+    except CircuitOpen as e:
+        raise OrcidError("ORCID is unavailable", 503) from e
+    except requests.RequestException as e:
+        raise OrcidError(f"ORCID request failed: {e}") from e
+    if response.status_code != 200:
+        raise OrcidError(f"ORCID returned {response.status_code}", response.status_code)
+    return response.json()
+
+
+def parse_work_summary(summary):
+    return {
+        "title": summary["title"]["title"]["value"],
+        "type": summary["type"],
+        "put-code": summary["put-code"],
+        "year": (summary.get("publication-date") or {}).get("year", {}).get("value"),
+        "journal": (summary.get("journal-title") or {}).get("value"),
+        "doi": next(
+            (id["value"] for id in (summary.get("external-ids") or {}).get("external-id", [])
+             if id["external-id-type"] == "doi"),
+            None
+        )
+    }
+
+
+def fetch_works():
+    data = orcid_get("works")
+    # the first summary of each group is ORCID's preferred version of the work
+    return [parse_work_summary(group["work-summary"][0]) for group in data.get("group", [])]
+
+
+def fetch_work(put_code):
+    return orcid_get(f"work/{put_code}")
+
+
+def fetch_works_bulk(put_codes):
+    # one round trip per BULK_LIMIT works instead of one per work
+    put_codes = list(put_codes)
+    works = {}
+    for start in range(0, len(put_codes), BULK_LIMIT):
+        chunk = put_codes[start:start + BULK_LIMIT]
+        data = orcid_get("works/" + ",".join(str(put_code) for put_code in chunk))
+        for item in data.get("bulk", []):
+            # unknown put-codes come back as {"error": ...} entries and are left out
+            if "work" in item:
+                works[item["work"]["put-code"]] = item["work"]
+    return works
+
+
+def get_works():
+    return orcid_cache.get("works", fetch_works)
+
+
+def get_work(put_code):
+    return orcid_cache.get(f"work:{put_code}", lambda: fetch_work(put_code))
+
+
+def get_work_details(put_codes):
+    # cached per work, under the same keys as get_work(), so the set of put-codes a client
+    # asks for never becomes a cache key; only the uncached ones go into the bulk request
+    keys = [f"work:{put_code}" for put_code in put_codes]
+
+    def load(missing):
+        works = fetch_works_bulk(int(key.split(":", 1)[1]) for key in missing)
+        return {f"work:{put_code}": work for put_code, work in works.items()}
+
+    works, state = orcid_cache.get_many(keys, load)
+    return {int(key.split(":", 1)[1]): work for key, work in works.items()}, state
+
+
+_synced = False
+
+
+def synced():
+    # research_works is never emptied once a sync has filled it, so a true answer is kept for the process
+    global _synced
+    if not _synced:
+        from app.models.ResearchWork import ResearchWork
+
+        _synced = db.session.query(ResearchWork.put_code).limit(1).first() is not None
+    return _synced
+
+
+def local_works(year=None, work_type=None):
+    from app.models.ResearchWork import ResearchWork
+
+    # the stored detail JSON is only needed for a single work
+    query = ResearchWork.query.options(defer(ResearchWork.detail))
+    if year is not None:
+        query = query.filter(ResearchWork.year == year)
+    if work_type is not None:
+        query = query.filter(ResearchWork.work_type == work_type)
+    # newest first, undated works last
+    query = query.order_by(ResearchWork.year.is_(None), ResearchWork.year.desc(), ResearchWork.put_code.desc())
+    return [work.to_dict() for work in query]
+
+
+def local_work(put_code):
+    from app.models.ResearchWork import ResearchWork
+
+    work = db.session.get(ResearchWork, put_code)
+    return work.detail_dict() if work is not None else None
+
+
+def local_work_details(put_codes):
+    from app.models.ResearchWork import ResearchWork
+
+    rows = db.session.query(ResearchWork.put_code, ResearchWork.detail).filter(ResearchWork.put_code.in_(put_codes))
+    return {put_code: json.loads(detail) for put_code, detail in rows if detail}
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from app.services.extenstions import db
+from app.services.orcid import orcid_get, parse_work_summary, fetch_works_bulk, OrcidError, BULK_LIMIT
+from app.services.upsert import bulk_upsert
+
+logger = logging.getLogger(__name__)
+
+
+def remote_summaries():
+    # one call for every work's summary; the details are only fetched for works that changed
+    summaries = {}
+    for group in orcid_get("works").get("group", []):
+        summary = group["work-summary"][0]
+        summaries[summary["put-code"]] = summary
+    return summaries
+
+
+def summary_row(summary, detail, now):
+    work = parse_work_summary(summary)
+    year = work["year"]
+    return {
+        "put_code": work["put-code"],
+        "title": work["title"],
+        "work_type": work["type"],
+        "year": int(year) if year and year.isdigit() else None,
+        "journal": work["journal"],
+        "doi": work["doi"],
+        "last_modified": (summary.get("last-modified-date") or {}).get("value") or 0,
+        "detail": json.dumps(detail),
+        "synced_at": now,
+    }
+
+
+def sync_works(full=False):
+    """Bring research_works in line with the ORCID record.
+
+    Works are matched on put-code; a work is refetched, in bulk requests,
+    only when it is new or its last-modified-date moved (every work with
+    full=True), and works gone from ORCID are deleted. Each bulk request is
+    committed on its own, so a failed request only leaves its works for the
+    next sync. Returns per-outcome counts.
+    """
+    from app.models.ResearchWork import ResearchWork
+
+    summaries = remote_summaries()
+    local = dict(db.session.query(ResearchWork.put_code, ResearchWork.last_modified))
+
+    changed = [
+        put_code for put_code, summary in summaries.items()
+        if full or local.get(put_code) != (summary.get("last-modified-date") or {}).get("value")
+    ]
+    removed = [put_code for put_code in local if put_code not in summaries]
+
+    fetched = failed = 0
+    for start in range(0, len(changed), BULK_LIMIT):
+        chunk = changed[start:start + BULK_LIMIT]
+        try:
+            details = fetch_works_bulk(chunk)
+        except OrcidError as e:
+            logger.warning('ORCID sync: fetching %d works failed (%s), retrying them next sync', len(chunk), e)
+            failed += len(chunk)
+            continue
+        # a work ORCID answered with an error entry is not stored, or its unchanged
+        # last-modified-date would stop the next sync from fetching it again
+        now = datetime.utcnow()
+        rows = [summary_row(summaries[put_code], details[put_code], now) for put_code in chunk if put_code in details]
+        bulk_upsert(ResearchWork.__table__, rows, ["put_code"])
+        db.session.commit()
+        fetched += len(rows)
+        failed += len(chunk) - len(rows)
+
+    if removed:
+        db.session.query(ResearchWork).filter(ResearchWork.put_code.in_(removed)).delete(synchronize_session=False)
+        db.session.commit()
+
+    return {
+        "fetched": fetched,
+        "failed": failed,
+        "unchanged": len(summaries) - len(changed),
+        "removed": len(removed),
+    }
+
+
+class OrcidSyncSchedule:
+    """Optional periodic ORCID sync, one daemon thread per worker process.
+
+    Disabled unless ORCID_SYNC_INTERVAL is set. An up-to-date table costs one
+    summary request per run, so overlapping runs from several workers are
+    harmless; runs are jittered so they do not line up.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ORCID_SYNC_INTERVAL', 0)
+        self.app = app
+        app.extensions['orcid_sync_schedule'] = self
+        if app.config['ORCID_SYNC_INTERVAL']:
+            # started on the first request so the thread lives in the forked worker, not the master
+            app.before_request(self.ensure_started)
+
+    def ensure_started(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._loop, name='orcid-sync', daemon=True).start()
+
+    def _loop(self):
+        interval = self.app.config['ORCID_SYNC_INTERVAL']
+        while True:
+            time.sleep(interval * random.uniform(0.75, 1.25))
+            with self.app.app_context():
+                try:
+                    logger.info('ORCID sync: %s', sync_works())
+                except Exception:
+                    logger.exception('ORCID sync failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
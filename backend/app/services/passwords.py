@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def pool_context():
+    # children must not be forked from a worker that already runs threads (job pool, schedules,
+    # request threads): a lock one of them held would stay locked forever in the child. The fork
+    # server is a fresh interpreter that starts single threaded and forks every child from there.
+    # Like spawn it imports the __main__ script once, which under gunicorn or `flask` is their launcher.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+# module level so the pool can pickle them; they run in the child processes
+def hash_password(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def check_password(pw_hash, password):
+    try:
+        return bcrypt.checkpw(password, pw_hash)
+    except ValueError:
+        # not a bcrypt hash
+        return False
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification in a bounded process pool.
+
+    A burst of logins queues at most PASSWORD_HASH_QUEUE_DEPTH calls per
+    worker; beyond that callers get PasswordHasherBusy immediately instead
+    of tying up the worker. PASSWORD_HASH_WORKERS = 0 hashes inline.
+    BCRYPT_LOG_ROUNDS is the target cost, and hashes stored with any other
+    cost are reported by needs_rehash().
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.workers = 0
+        self.timeout = None
+        self._slots = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('BCRYPT_LOG_ROUNDS', 12)
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        app.config.setdefault('PASSWORD_HASH_QUEUE_DEPTH', 16)
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 30)
+        self.rounds = app.config['BCRYPT_LOG_ROUNDS']
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        self._slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_QUEUE_DEPTH'])
+        app.extensions['password_hasher'] = self
+
+    def executor(self):
+        # created lazily so every gunicorn worker gets its own pool
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Too many password operations in progress')
+        try:
+            return self.executor().submit(fn, *args).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # a child died; start a fresh pool on the next call
+            with self._lock:
+                self._executor = None
+            raise
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, password.encode('utf-8'), self.rounds)
+
+    def check(self, pw_hash, password):
+        return self._run(check_password, pw_hash.encode('utf-8'), password.encode('utf-8'))
+
+    def needs_rehash(self, pw_hash):
+        # $2b$<cost>$<salt and hash>
+        try:
+            return int(pw_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
@@ -0,0 +1,25 @@
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def register_query_counter(app):
+    """Count SQL statements per request and report them in X-Query-Count when QUERY_COUNT_HEADER is set."""
+    app.config.setdefault('QUERY_COUNT_HEADER', False)
+    if not event.contains(Engine, 'before_cursor_execute', count_query):
+        event.listen(Engine, 'before_cursor_execute', count_query)
+
+    @app.before_request
+    def reset_query_count():
+        g.query_count = 0
+
+    @app.after_request
+    def add_query_count(response):
+        if app.config['QUERY_COUNT_HEADER']:
+            response.headers['X-Query-Count'] = str(g.get('query_count', 0))
+        return response
@@ -0,0 +1,81 @@
+import itertools
+import sqlite3
+from sqlalchemy import select, func, Float
+from app.models.User import User
+from app.models.QuizMark import QuizMark
+from app.services.extenstions import db, rank_cache
+
+
+def supports_window_functions():
+    dialect = db.engine.dialect
+    if dialect.name == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25)
+    if dialect.name == "mysql":
+        version = dialect.server_version_info or (0,)
+        return version >= ((10, 2) if getattr(dialect, "is_mariadb", False) else (8, 0))
+    return True
+
+
+def leaderboard_query(quiz_id, *columns):
+    return (
+        select(QuizMark.user_id, User.name, User.kauid, QuizMark.score, *columns)
+        .join(User, User.uid == QuizMark.user_id)
+        .where(QuizMark.quiz_id == quiz_id)
+        .order_by(QuizMark.score.desc(), QuizMark.user_id)
+    )
+
+
+def ranked_rows(quiz_id):
+    # rank 1 is the top score; percent_rank is the share of other students scoring strictly lower
+    return db.session.execute(leaderboard_query(
+        quiz_id,
+        func.rank().over(order_by=QuizMark.score.desc()),
+        func.percent_rank(type_=Float).over(order_by=QuizMark.score.asc())
+    )).all()
+
+
+def ranked_rows_fallback(quiz_id):
+    # same figures from the already ordered rows, for MySQL < 8 and old SQLite builds
+    rows = db.session.execute(leaderboard_query(quiz_id)).all()
+    total = len(rows)
+    ranked = []
+    for _, group in itertools.groupby(rows, key=lambda row: row.score):
+        group = list(group)
+        higher = len(ranked)
+        lower = total - higher - len(group)
+        ranked.extend((*row, higher + 1, lower / (total - 1) if total > 1 else 0.0) for row in group)
+    return ranked
+
+
+def load_leaderboard(quiz_id):
+    rows = ranked_rows(quiz_id) if supports_window_functions() else ranked_rows_fallback(quiz_id)
+    entries = [
+        {
+            "user_id": user_id,
+            "name": name,
+            "kauid": kauid,
+            "score": score,
+            "rank": int(rank),
+            "percentile": round(float(percent_rank) * 100, 2),
+        }
+        for user_id, name, kauid, score, rank, percent_rank in rows
+    ]
+    # str keys, as a JSON backed cache would hand them back
+    return {"entries": entries, "positions": {str(entry["user_id"]): i for i, entry in enumerate(entries)}}
+
+
+def get_leaderboard(quiz_id):
+    return rank_cache.get_or_set(str(quiz_id), lambda: load_leaderboard(quiz_id))
+
+
+def get_student_rank(quiz_id, uid):
+    leaderboard = get_leaderboard(quiz_id)
+    position = leaderboard["positions"].get(str(uid))
+    if position is None:
+        return None
+    return {**leaderboard["entries"][position], "total": len(leaderboard["entries"])}
+
+
+def invalidate_leaderboards(quiz_ids):
+    if quiz_ids:
+        rank_cache.invalidate(*[str(quiz_id) for quiz_id in quiz_ids])
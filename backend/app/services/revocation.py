@@ -0,0 +1,88 @@
+import calendar
+import threading
+import time
+from datetime import datetime, timedelta
+from app.services.cache import make_backend
+from app.services.extenstions import db
+
+COUNTER_KEY = 'token_blocklist:version'
+
+
+class RevokedTokens:
+    """Per-process set of revoked JTIs kept in step with token_blocklist.
+
+    Every revocation bumps a counter in the shared cache backend. A request
+    only reads that counter; the table is queried when the counter moves or
+    the local copy is older than JWT_REVOCATION_MAX_AGE, so a token that was
+    never revoked costs no database round trip. Each query re-reads rows
+    created since JWT_REVOCATION_SYNC_OVERLAP seconds before the previous
+    one: ids and commit order can disagree, so a row that committed late is
+    still picked up. Entries are dropped once the token has expired.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.lifetime = None
+        self.max_age = 0
+        self.overlap = timedelta(0)
+        self._revoked = {}
+        self._synced_from = None
+        self._version = None
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # the counter lives in the shared cache file with either CACHE_BACKEND, so other workers see revocations
+        app.config.setdefault('JWT_REVOCATION_MAX_AGE', 300)
+        app.config.setdefault('JWT_REVOCATION_SYNC_OVERLAP', 300)
+        self.backend = make_backend(app)
+        self.max_age = app.config['JWT_REVOCATION_MAX_AGE']
+        self.overlap = timedelta(seconds=app.config['JWT_REVOCATION_SYNC_OVERLAP'])
+        self.lifetime = max(app.config['JWT_ACCESS_TOKEN_EXPIRES'], app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+        # a new backend has its own counter, so the local copy starts over with it
+        with self._lock:
+            self._revoked = {}
+            self._synced_from = None
+            self._version = None
+            self._synced_at = 0.0
+        app.extensions['revoked_tokens'] = self
+
+    def revoke(self, jti, expires_at):
+        # called once the TokenBlocklist row is committed, so a worker that sees the new counter also sees the row
+        with self._lock:
+            self._revoked[jti] = expires_at
+        self.backend.incr_counter(COUNTER_KEY)
+
+    def is_revoked(self, jti):
+        version = self.backend.get_counter(COUNTER_KEY)
+        now = time.time()
+        with self._lock:
+            if version != self._version or now - self._synced_at >= self.max_age:
+                self._sync(version, now)
+            expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > now
+
+    def _sync(self, version, now):
+        from app.models.TokenBlackList import TokenBlocklist
+
+        started = datetime.utcnow()
+        # rows older than the longest token lifetime belong to tokens that have expired anyway
+        since = started - self.lifetime - timedelta(days=1)
+        if self._synced_from is not None:
+            since = max(since, self._synced_from - self.overlap)
+        query = db.session.query(TokenBlocklist.jti, TokenBlocklist.created_at, TokenBlocklist.expires_at).filter(
+            TokenBlocklist.created_at >= since
+        )
+        for jti, created_at, expires_at in query:
+            if expires_at is None:
+                # rows from before expires_at had a bare date in created_at, so allow a day on top of the longest lifetime
+                expires_at = created_at + self.lifetime + timedelta(days=1)
+            self._revoked.setdefault(jti, calendar.timegm(expires_at.timetuple()))
+        self._synced_from = started
+
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+        self._version = version
+        self._synced_at = now
@@ -0,0 +1,249 @@
+import bisect
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import defaultdict
+from flask import current_app
+from app.models.NCAAA_Courses.NCAAA_Course import NCAAA_Course
+from app.services.extenstions import db, catalog_cache
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+CODE_PARTS_RE = re.compile(r'[a-z]+|[0-9]+')
+FIELD_WEIGHTS = {'course_code': 4.0, 'course_name': 2.0, 'course_description': 1.0}
+PREFIX_FACTOR = 0.6
+MAX_PREFIX_EXPANSIONS = 64
+# postings scored for the most selective query token; beyond it a query costs the same however big the catalog is
+MAX_CANDIDATES = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class InvertedIndex:
+    def __init__(self):
+        self.postings = {}  # term -> {course_id: weighted term frequency}
+        self.ranked = {}  # term -> [(weight, course_id)] heaviest first, built when a search first needs it
+        self.terms = []  # sorted vocabulary, used for prefix lookups
+        self.documents = {}
+        self.doc_terms = {}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, course_id, course_code, course_name, course_description):
+        if course_id in self.documents:
+            self.remove(course_id)
+
+        weights = defaultdict(float)
+        for field, text in (('course_code', course_code), ('course_name', course_name), ('course_description', course_description)):
+            for token in tokenize(text):
+                weights[token] += FIELD_WEIGHTS[field]
+        # codes like CS101 are also searchable by their letter and number halves
+        for token in tokenize(course_code):
+            for part in CODE_PARTS_RE.findall(token):
+                if part != token:
+                    weights[part] += FIELD_WEIGHTS['course_code']
+
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                bisect.insort(self.terms, term)
+            self.postings[term][course_id] = weight
+            self.ranked.pop(term, None)
+
+        self.documents[course_id] = {
+            'course_id': course_id,
+            'course_code': course_code,
+            'course_name': course_name,
+        }
+        self.doc_terms[course_id] = list(weights)
+
+    def remove(self, course_id):
+        for term in self.doc_terms.pop(course_id, ()):
+            postings = self.postings[term]
+            postings.pop(course_id, None)
+            self.ranked.pop(term, None)
+            if not postings:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+        self.documents.pop(course_id, None)
+
+    def expand(self, token):
+        # (term, factor) pairs for the token and at most MAX_PREFIX_EXPANSIONS longer terms,
+        # plus whether more terms than that start with it
+        expansions = [(token, 1.0)] if token in self.postings else []
+        prefixed = []
+        i = bisect.bisect_left(self.terms, token)
+        while i < len(self.terms) and len(prefixed) <= MAX_PREFIX_EXPANSIONS and self.terms[i].startswith(token):
+            if self.terms[i] != token:
+                prefixed.append(self.terms[i])
+            i += 1
+        expansions.extend((term, PREFIX_FACTOR) for term in prefixed[:MAX_PREFIX_EXPANSIONS])
+        return expansions, len(prefixed) > MAX_PREFIX_EXPANSIONS
+
+    def impact_ordered(self, term, boost):
+        # a term's score only grows with its weight, so this yields (score, course_id) best first
+        if term not in self.ranked:
+            self.ranked[term] = sorted(((weight, course_id) for course_id, weight in self.postings[term].items()), reverse=True)
+        return ((boost * weight / (weight + 1.2), course_id) for weight, course_id in self.ranked[term])
+
+    def search(self, query, limit=20):
+        """Return (total, results, truncated) for a query.
+
+        Every query token must match, exactly or as a prefix, and scores are
+        idf weighted. The token with the fewest postings picks the candidates,
+        its best MAX_CANDIDATES at most, and the other tokens only filter and
+        add to those. truncated is true when that cap was reached or a token
+        was a prefix of more than MAX_PREFIX_EXPANSIONS terms; total is then a
+        lower bound and the ranking covers the candidates that were scored.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0, [], False
+
+        total_docs = len(self.documents)
+        truncated = False
+        expanded = []
+        for token in tokens:
+            expansions, token_truncated = self.expand(token)
+            truncated = truncated or token_truncated
+            if not expansions:
+                return 0, [], truncated
+            terms = []
+            for term, factor in expansions:
+                matches = len(self.postings[term])
+                terms.append((term, factor * math.log(1 + (total_docs - matches + 0.5) / (matches + 0.5))))
+            expanded.append(terms)
+        expanded.sort(key=lambda terms: sum(len(self.postings[term]) for term, _ in terms))
+
+        scores = {}
+        # merged best first, so a course's first score is its best one for the token
+        for score, course_id in heapq.merge(*(self.impact_ordered(term, boost) for term, boost in expanded[0]), reverse=True):
+            if course_id in scores:
+                continue
+            if len(scores) == MAX_CANDIDATES:
+                truncated = True
+                break
+            scores[course_id] = score
+
+        for terms in expanded[1:]:
+            token_scores = {}
+            for term, boost in terms:
+                postings = self.postings[term]
+                # walk whichever side is shorter
+                if len(postings) <= len(scores):
+                    matches = [(course_id, weight) for course_id, weight in postings.items() if course_id in scores]
+                else:
+                    matches = [(course_id, postings[course_id]) for course_id in scores if course_id in postings]
+                for course_id, weight in matches:
+                    score = boost * weight / (weight + 1.2)
+                    if score > token_scores.get(course_id, 0.0):
+                        token_scores[course_id] = score
+            scores = {course_id: scores[course_id] + score for course_id, score in token_scores.items()}
+            if not scores:
+                return 0, [], truncated
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return len(scores), [dict(self.documents[course_id], score=round(score, 4)) for course_id, score in best], truncated
+
+
+class CatalogSearch:
+    """Per-worker search index over the NCAAA catalog.
+
+    The index remembers which catalog version it was built from. Writes in
+    this worker are applied incrementally. Any other version change (a write
+    handled by another worker) starts a rebuild in a background thread, and
+    searches keep using the current index until the new one replaces it;
+    only the first search in a worker waits for a build.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._version = None
+        self._rebuilding = False
+        self._lock = threading.Lock()
+
+    def build(self):
+        index = InvertedIndex()
+        rows = db.session.query(
+            NCAAA_Course.course_id,
+            NCAAA_Course.course_code,
+            NCAAA_Course.course_name,
+            NCAAA_Course.course_description
+        ).all()
+        for row in rows:
+            index.add(*row)
+        return index
+
+    def current(self):
+        version = catalog_cache.version()
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self.build()
+                    self._version = version
+        elif self._version != version:
+            self._rebuild_in_background(version)
+        return self._index
+
+    def _rebuild_in_background(self, version):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        app = current_app._get_current_object()
+        threading.Thread(target=self._rebuild, args=(app, version), name='search-rebuild', daemon=True).start()
+
+    def _rebuild(self, app, version):
+        try:
+            with app.app_context():
+                index = self.build()
+            with self._lock:
+                # a write in this worker may have patched the old index past the version we built
+                if self._version < version:
+                    self._index = index
+                    self._version = version
+        except Exception:
+            logger.exception('Rebuilding the catalog search index failed, still serving version %s', self._version)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def search(self, query, limit=20):
+        index = self.current()
+        # writes patch the index in place, so readers take the same lock
+        with self._lock:
+            return index.search(query, limit)
+
+    def _apply(self, version, change):
+        with self._lock:
+            # only patch an index that is exactly one write behind, otherwise rebuild lazily
+            if self._index is not None and self._version == version - 1:
+                change(self._index)
+                self._version = version
+
+    def add_courses(self, courses, version):
+        def change(index):
+            for course in courses:
+                index.add(course['course_id'], course['course_code'], course['course_name'], course['course_description'])
+        self._apply(version, change)
+
+    def add_course(self, course, version):
+        self.add_courses([course.to_dict()], version)
+
+    def remove_courses(self, course_ids, version):
+        def change(index):
+            for course_id in course_ids:
+                index.remove(course_id)
+        self._apply(version, change)
+
+    def remove_course(self, course_id, version):
+        self.remove_courses([course_id], version)
+
+
+catalog_search = CatalogSearch()
@@ -0,0 +1,208 @@
+import os
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, request, Response
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; coalescing then stays within a worker
+    fcntl = None
+
+# per-client headers a shared response must never carry
+PRIVATE_HEADERS = ('Set-Cookie',)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls into one execution.
+
+    Within a worker, callers that arrive while a call with the same key is
+    running wait for it and share its result. Across workers only cache
+    misses are serialised: with SINGLE_FLIGHT_CROSS_WORKER a shared cache
+    runs its loader through fill(), under a file lock picked by hashing the
+    cache key into one of SINGLE_FLIGHT_LOCK_BUCKETS, so hits never touch a
+    lock and unrelated keys rarely share one. Nobody waits on either lock
+    longer than SINGLE_FLIGHT_TIMEOUT.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.timeout = 30
+        self.cross_worker = False
+        self.lock_dir = None
+        self.lock_buckets = 64
+        self.counts = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SINGLE_FLIGHT_ENABLED', True)
+        app.config.setdefault('SINGLE_FLIGHT_TIMEOUT', 30)
+        app.config.setdefault('SINGLE_FLIGHT_CROSS_WORKER', False)
+        app.config.setdefault('SINGLE_FLIGHT_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'atif_courses_locks'))
+        app.config.setdefault('SINGLE_FLIGHT_LOCK_BUCKETS', 64)
+        self.enabled = app.config['SINGLE_FLIGHT_ENABLED']
+        self.timeout = app.config['SINGLE_FLIGHT_TIMEOUT']
+        self.cross_worker = app.config['SINGLE_FLIGHT_CROSS_WORKER'] and fcntl is not None
+        self.lock_dir = app.config['SINGLE_FLIGHT_LOCK_DIR']
+        self.lock_buckets = app.config['SINGLE_FLIGHT_LOCK_BUCKETS']
+        if self.cross_worker:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        app.extensions['single_flight'] = self
+
+    def do(self, name, key, fn):
+        """Run fn() once for every caller that asks for (name, key) while it is running."""
+        return self._run(name, key, fn)[0]
+
+    def fill(self, name, key, lookup, load):
+        """Cache-miss path of a cache shared by the workers on this host.
+
+        lookup() returns the cached entry or None, load() builds and stores it.
+        Under the key's file lock the cache is looked up again first, so a
+        worker that waited on another one's load returns what that stored.
+        """
+        if not (self.enabled and self.cross_worker):
+            return load()
+        with self._worker_lock(name, key):
+            entry = lookup()
+            if entry is not None:
+                self._record(name, 'coalesced')
+                return entry
+            return load()
+
+    def _run(self, name, key, fn):
+        # returns (result, whether this caller ran fn itself)
+        if not self.enabled:
+            return fn(), True
+
+        flight_key = (name, key)
+        with self._lock:
+            self._count(name, 'calls')
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight()
+            else:
+                self._count(name, 'coalesced')
+
+        if not leader:
+            if not flight.done.wait(self.timeout):
+                # the running call is stuck; do not hang every follower on it
+                self._record(name, 'timeouts')
+                return fn(), True
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, False
+
+        try:
+            flight.result = fn()
+            return flight.result, True
+        except Exception as e:
+            flight.error = e
+            self._record(name, 'errors')
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(flight_key, None)
+            flight.done.set()
+
+    def coalesce(self, name=None, key=None):
+        """Route decorator: concurrent GETs for the same response are answered by one view call.
+
+        The default key is the path and query string plus the headers that change
+        the representation. Only use it on responses that do not depend on the
+        caller, or pass a `key` callable that includes the caller.
+        """
+        def decorator(view):
+            flight_name = name or view.__name__
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return view(*args, **kwargs)
+
+                def render():
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.is_streamed or response.direct_passthrough:
+                        # a stream can only be consumed once; followers call the view themselves
+                        return response, None
+                    headers = [(k, v) for k, v in response.headers.items() if k not in PRIVATE_HEADERS]
+                    return response, (response.get_data(), response.status, headers)
+
+                request_key = key() if key is not None else request_key_for(request)
+                (response, shared), ran_view = self._run(flight_name, request_key, render)
+                if ran_view:
+                    return response
+                if shared is None:
+                    return view(*args, **kwargs)
+                body, status, headers = shared
+                return Response(body, status=status, headers=headers)
+
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def _worker_lock(self, name, key):
+        # crc32, not hash(), so every worker maps a key to the same file
+        bucket = zlib.crc32(str(key).encode()) % self.lock_buckets
+        with open(os.path.join(self.lock_dir, f'bucket-{bucket}.lock'), 'a') as handle:
+            # polled rather than blocking, so a stuck holder in another worker only delays us until the timeout;
+            # the first retries are quick since most loads finish in a few milliseconds
+            deadline = time.monotonic() + self.timeout
+            delay = 0.001
+            while True:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    locked = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        self._record(name, 'timeouts')
+                        locked = False
+                        break
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.05)
+            try:
+                yield
+            finally:
+                if locked:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _count(self, name, counter):
+        # callers hold self._lock
+        counts = self.counts.setdefault(name, {'calls': 0, 'coalesced': 0, 'errors': 0, 'timeouts': 0})
+        counts[counter] += 1
+
+    def _record(self, name, counter):
+        with self._lock:
+            self._count(name, counter)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'cross_worker': self.cross_worker,
+                'in_flight': len(self._flights),
+                'routes': {name: dict(counts) for name, counts in self.counts.items()},
+            }
+
+
+def request_key_for(req):
+    return (
+        req.method,
+        req.full_path,
+        req.headers.get('Accept-Encoding', ''),
+        req.headers.get('If-None-Match', ''),
+    )
@@ -0,0 +1,108 @@
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_
+from app.services.extenstions import db
+
+logger = logging.getLogger(__name__)
+
+# rows written before expires_at existed only have created_at, which used to be a bare date
+LEGACY_SLACK = timedelta(days=1)
+
+
+def expired(model, now, lifetime):
+    return or_(
+        model.expires_at < now,
+        and_(model.expires_at.is_(None), model.created_at < now - lifetime - LEGACY_SLACK)
+    )
+
+
+def purge_rows(model, key, condition, batch_size, max_batches=None):
+    # short transactions: select a page of keys, delete by primary key, commit, repeat
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        keys = [row[0] for row in db.session.query(key).filter(condition).limit(batch_size)]
+        if not keys:
+            break
+        db.session.query(model).filter(key.in_(keys)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(keys)
+        batches += 1
+        if len(keys) < batch_size:
+            break
+    return deleted
+
+
+def purge_expired_tokens(config, batch_size=1000, max_batches=None):
+    from app.models.TokenBlackList import TokenBlocklist
+    from app.models.RefreshToken import RefreshToken
+
+    now = datetime.utcnow()
+    token_lifetime = max(config['JWT_ACCESS_TOKEN_EXPIRES'], config['JWT_REFRESH_TOKEN_EXPIRES'])
+    return {
+        'token_blocklist': purge_rows(
+            TokenBlocklist, TokenBlocklist.id,
+            expired(TokenBlocklist, now, token_lifetime),
+            batch_size, max_batches
+        ),
+        'refresh_tokens': purge_rows(
+            RefreshToken, RefreshToken.refresh_token_id,
+            expired(RefreshToken, now, config['JWT_REFRESH_TOKEN_EXPIRES']),
+            batch_size, max_batches
+        ),
+    }
+
+
+class TokenPurgeSchedule:
+    """Optional background purge, one daemon thread per worker process.
+
+    Disabled unless TOKEN_PURGE_INTERVAL is set. Each run is capped at
+    TOKEN_PURGE_MAX_BATCHES batches per table, and runs are jittered so
+    workers started together do not purge in lockstep.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TOKEN_PURGE_INTERVAL', 0)
+        app.config.setdefault('TOKEN_PURGE_BATCH_SIZE', 1000)
+        app.config.setdefault('TOKEN_PURGE_MAX_BATCHES', 50)
+        self.app = app
+        app.extensions['token_purge_schedule'] = self
+        if app.config['TOKEN_PURGE_INTERVAL']:
+            # started on the first request so the thread lives in the forked worker, not the master
+            app.before_request(self.ensure_started)
+
+    def ensure_started(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._loop, name='token-purge', daemon=True).start()
+
+    def _loop(self):
+        interval = self.app.config['TOKEN_PURGE_INTERVAL']
+        while True:
+            time.sleep(interval * random.uniform(0.75, 1.25))
+            with self.app.app_context():
+                try:
+                    deleted = purge_expired_tokens(
+                        self.app.config,
+                        self.app.config['TOKEN_PURGE_BATCH_SIZE'],
+                        self.app.config['TOKEN_PURGE_MAX_BATCHES']
+                    )
+                    logger.info('Purged expired tokens: %s', deleted)
+                except Exception:
+                    logger.exception('Token purge failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
@@ -0,0 +1,55 @@
+from sqlalchemy import select, and_
+from app.models.Course import Course
+from app.models.Quiz import Quiz
+from app.models.QuizMark import QuizMark
+from app.models.associations import student_course
+from app.services.extenstions import db, grades_cache
+
+
+def load_transcript(uid):
+    # enrollments -> courses -> quizzes -> this student's marks, in a single statement
+    rows = db.session.execute(
+        select(
+            Course.course_id, Course.course_code, Course.course_name,
+            Quiz.quiz_id, Quiz.title, QuizMark.score
+        )
+        .select_from(student_course)
+        .join(Course, Course.course_id == student_course.c.course_id)
+        .outerjoin(Quiz, Quiz.course_id == Course.course_id)
+        .outerjoin(QuizMark, and_(QuizMark.quiz_id == Quiz.quiz_id, QuizMark.user_id == uid))
+        .where(student_course.c.user_id == uid)
+        .order_by(Course.course_id, Quiz.quiz_id)
+    ).all()
+
+    courses = []
+    for course_id, course_code, course_name, quiz_id, title, score in rows:
+        if not courses or courses[-1]["course_id"] != course_id:
+            courses.append({
+                "course_id": course_id,
+                "course_code": course_code,
+                "course_name": course_name,
+                "quizzes": [],
+                "marked": 0,
+                "average": None,
+            })
+        course = courses[-1]
+        if quiz_id is None:
+            continue
+        course["quizzes"].append({"quiz_id": quiz_id, "title": title, "score": score})
+        if score is not None:
+            course["average"] = ((course["average"] or 0.0) * course["marked"] + score) / (course["marked"] + 1)
+            course["marked"] += 1
+
+    for course in courses:
+        if course["average"] is not None:
+            course["average"] = round(course["average"], 4)
+    return courses
+
+
+def get_transcript(uid):
+    return grades_cache.get_or_set(str(uid), lambda: load_transcript(uid))
+
+
+def invalidate_transcripts(uids):
+    if uids:
+        grades_cache.invalidate(*[str(uid) for uid in uids])
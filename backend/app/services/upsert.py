@@ -0,0 +1,48 @@
+from sqlalchemy import insert, update, bindparam, and_
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from app.services.extenstions import db
+
+
+def existing_keys(table, rows, keys):
+    # each key column is narrowed with an IN list, exact tuples are matched in Python
+    wanted = {tuple(row[k] for k in keys) for row in rows}
+    query = db.session.query(*[table.c[k] for k in keys]).filter(
+        *[table.c[k].in_({key[i] for key in wanted}) for i, k in enumerate(keys)]
+    )
+    return {tuple(row) for row in query if tuple(row) in wanted}
+
+
+def bulk_upsert(table, rows, keys):
+    """Insert rows, updating the non-key columns of rows whose keys already exist.
+
+    Uses ON DUPLICATE KEY UPDATE on MySQL and ON CONFLICT DO UPDATE on SQLite
+    and PostgreSQL, falling back to a lookup plus separate insert/update
+    statements elsewhere. `keys` must match a primary key or unique constraint.
+    """
+    if not rows:
+        return
+
+    columns = [c for c in rows[0] if c not in keys]
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in columns})
+    elif dialect in ("sqlite", "postgresql"):
+        stmt = sqlite.insert(table) if dialect == "sqlite" else postgresql.insert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=keys, set_={c: stmt.excluded[c] for c in columns})
+    else:
+        present = existing_keys(table, rows, keys)
+        new = [row for row in rows if tuple(row[k] for k in keys) not in present]
+        changed = [row for row in rows if tuple(row[k] for k in keys) in present]
+        if new:
+            db.session.execute(insert(table), new)
+        if changed and columns:
+            db.session.connection().execute(
+                update(table)
+                .where(and_(*[table.c[k] == bindparam(f"b_{k}") for k in keys]))
+                .values({c: bindparam(f"b_{c}") for c in columns}),
+                [{f"b_{k}": v for k, v in row.items()} for row in changed]
+            )
+        return
+
+    db.session.execute(stmt, rows)
@@ -1,13 +1,43 @@
+import base64
+import json
 from functools import wraps
-from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from flask_jwt_extended import verify_jwt_in_request, get_current_user
 from flask import jsonify
 
 def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        claims = get_jwt()
-        if claims.get("role") != "admin":
+        # the stored role, not the token claim, so a demotion applies before the token expires
+        user = get_current_user()
+        if user is None or not user.is_admin or not user.is_active:
             return jsonify({"error": "Admin access required"}), 403
         return fn(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def encode_cursor(key, value):
+    # opaque keyset cursor; the key guards against reusing a cursor with another ordering
+    raw = json.dumps([key, value], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, key):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_key, value = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(value, (int, str)):
+        raise ValueError('Invalid cursor')
+    if cursor_key != key:
+        raise ValueError('Cursor does not match sort order')
+    return value
+
+def parse_limit(args, default, maximum):
+    try:
+        limit = int(args.get('limit', default))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if not 1 <= limit <= maximum:
+        raise ValueError(f'limit must be between 1 and {maximum}')
+    return limit
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Build time and memory of the gradebook matrix against ORM QuizMark objects.
+
+    python benchmarks/bench_gradebook_matrix.py [students] [quizzes]
+
+Runs against a throwaway SQLite file. "retained" is what the gradebook keeps
+once built, "peak" includes the rows in flight while loading.
+"""
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.services.extenstions import db
+from app.models.User import User
+from app.models.Course import Course
+from app.models.Quiz import Quiz
+from app.models.QuizMark import QuizMark
+from app.models.RefreshToken import RefreshToken  # noqa: F401, User.refresh_tokens needs it mapped
+from app.services.gradebook_matrix import load_gradebook_matrix
+
+
+def seed(students, quizzes, rng):
+    db.session.add(Course(course_code='BENCH', course_name='Benchmark'))
+    db.session.execute(insert(User), [
+        {'uid': uid, 'email': f'{uid}@bench.local', 'password_hash': '-', 'name': f'student {uid}', 'kauid': 2000000 + uid}
+        for uid in range(1, students + 1)
+    ])
+    db.session.execute(insert(Quiz), [{'quiz_id': q, 'title': f'Quiz {q}', 'course_id': 1} for q in range(1, quizzes + 1)])
+    db.session.execute(insert(QuizMark), [
+        {'user_id': uid, 'quiz_id': q, 'score': rng.randint(0, 200) / 2}
+        for uid in range(1, students + 1) for q in range(1, quizzes + 1)
+    ])
+    db.session.commit()
+
+
+def orm_gradebook(course_id):
+    marks = QuizMark.query.join(Quiz).filter(Quiz.course_id == course_id).all()
+    gradebook = {}
+    for mark in marks:
+        gradebook.setdefault(mark.user_id, {})[mark.quiz_id] = mark.score
+    return marks, gradebook
+
+
+def measure(build):
+    times = []
+    for _ in range(3):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        build()
+        times.append(time.perf_counter() - started)
+
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return min(times), retained, peak
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    quizzes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        seed(students, quizzes, random.Random(0))
+        print(f'{students} students x {quizzes} quizzes = {students * quizzes} marks')
+        for name, build in (('orm objects', lambda: orm_gradebook(1)), ('matrix', lambda: load_gradebook_matrix(1))):
+            best, retained, peak = measure(build)
+            print(f'{name:12} build {best * 1000:7.1f} ms   retained {retained / 2**20:7.1f} MiB   peak {peak / 2**20:7.1f} MiB')
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Time the vectorized gradebook statistics on synthetic marks.
+
+    python benchmarks/bench_gradebook_stats.py [marks] [quizzes]
+
+Only the NumPy part is timed; the columnar fetch depends on the database.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.gradebook_stats import group_stats, total_stats
+
+
+def main():
+    marks = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    quizzes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rng = np.random.default_rng(0)
+    quiz_ids = rng.integers(1, quizzes + 1, size=marks)
+    # marks to one decimal, as uploads have them
+    scores = rng.integers(0, 1001, size=marks) / 10.0
+
+    runs = []
+    for _ in range(10):
+        started = time.perf_counter()
+        per_quiz = group_stats(quiz_ids, scores, 10, 0.0, 100.0, 50.0)
+        total_stats(per_quiz, scores)
+        runs.append(time.perf_counter() - started)
+    runs.sort()
+    print(f'{marks} marks, {quizzes} quizzes: median {runs[len(runs) // 2] * 1000:.1f} ms, best {runs[0] * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Per-check overhead of the rate limit storages, and whether a limit holds across processes.
+
+    python benchmarks/bench_rate_limit_storage.py [processes]
+
+Each storage is timed on one process doing hits against a "5 per hour"
+style limit, then `processes` forked workers race for the same key; with
+per-process memory every worker gets its own allowance.
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from app.services import rate_limit_storage  # noqa: F401, registers sqlite://
+
+CHECKS = 20000
+LIMIT = parse('5 per hour')
+
+
+def overhead(uri):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    started = time.perf_counter()
+    for i in range(CHECKS):
+        limiter.hit(LIMIT, 'login', f'10.0.{i % 250}.{i % 200}')
+    return (time.perf_counter() - started) / CHECKS * 1e6
+
+
+def allowed(uri, attempts, results):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    results.put(sum(limiter.hit(LIMIT, 'login', '10.9.9.9') for _ in range(attempts)))
+
+
+def allowed_across(uri, processes):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=allowed, args=(uri, 10, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(results.get() for _ in workers)
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    workdir = tempfile.mkdtemp()
+    storages = {
+        'memory': 'memory://',
+        'sqlite': f"sqlite:///{os.path.join(workdir, 'overhead.sqlite3')}",
+    }
+    print(f'{CHECKS} hits, limit {LIMIT}, {processes} processes x 10 attempts')
+    for name, uri in storages.items():
+        per_hit = overhead(uri)
+        if name == 'sqlite':
+            uri = f"sqlite:///{os.path.join(workdir, 'shared.sqlite3')}"
+        print(f'{name:7} {per_hit:7.1f} us per hit   allowed across processes: {allowed_across(uri, processes)} (limit 5)')
+
+
+if __name__ == '__main__':
+    main()
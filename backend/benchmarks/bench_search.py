@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Query latency of the NCAAA search index as the catalog grows.
+
+Descriptions draw from a Zipf-distributed vocabulary, so common words behave
+like "introduction" and rare ones like a specific topic. A query scores at
+most MAX_CANDIDATES courses for its most selective word, so latency stops
+growing with the catalog once common words match more courses than that.
+
+    python benchmarks/bench_search.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.search import InvertedIndex
+
+WORDS = (
+    'introduction advanced data structures algorithms programming systems network security '
+    'database design analysis software engineering operating computer architecture machine '
+    'learning statistics calculus linear algebra discrete mathematics physics chemistry '
+    'biology management accounting finance marketing ethics research methods project'
+).split()
+# synthetic long tail so descriptions are not made of the same few words
+VOCABULARY = WORDS + [f'topic{n}' for n in range(5000)]
+QUERIES = ['data', 'progr', 'cs1', 'machine learning', 'intro algo', 'topic123', 'zzz']
+SIZES = (100, 1000, 5000, 20000)
+
+
+def make_catalog(size, rng):
+    for course_id in range(1, size + 1):
+        code = f"{rng.choice(['CS', 'IS', 'IT', 'MATH', 'STAT'])}{course_id}"[:6]
+        name = ' '.join(rng.sample(WORDS, 3)).title()
+        description = ' '.join(VOCABULARY[min(int(rng.paretovariate(1.1)) - 1, len(VOCABULARY) - 1)] for _ in range(60))
+        yield course_id, code, name, description
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'courses':>8} {'build ms':>9} " + ' '.join(f'{q!r:>18}' for q in QUERIES))
+    for size in SIZES:
+        index = InvertedIndex()
+        started = time.perf_counter()
+        for course in make_catalog(size, rng):
+            index.add(*course)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        timings = []
+        for query in QUERIES:
+            runs = []
+            for _ in range(50):
+                started = time.perf_counter()
+                index.search(query, limit=20)
+                runs.append(time.perf_counter() - started)
+            runs.sort()
+            timings.append(runs[len(runs) // 2] * 1000)
+        print(f'{size:>8} {build_ms:>9.1f} ' + ' '.join(f'{t:>15.3f} ms' for t in timings))
+
+
+if __name__ == '__main__':
+    main()
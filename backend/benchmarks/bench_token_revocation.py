@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Per-request cost of the revoked-token check, database query against the JTI cache.
+
+    python benchmarks/bench_token_revocation.py [blocklist_rows]
+
+Uses a throwaway SQLite database and the SQLite cache backend, as a
+multi-worker deployment would. On MySQL the query side also pays a network
+round trip, so the gap only grows.
+"""
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.services.extenstions import db
+from app.models.TokenBlackList import TokenBlocklist
+# the rest of the models are imported so the mapper registry can resolve User's relationships
+from app.models.User import User  # noqa: F401
+from app.models.Course import Course  # noqa: F401
+from app.models.Quiz import Quiz  # noqa: F401
+from app.models.QuizMark import QuizMark  # noqa: F401
+from app.models.RefreshToken import RefreshToken  # noqa: F401
+from app.services.revocation import RevokedTokens
+
+CHECKS = 20000
+
+
+def per_check(check, jtis):
+    started = time.perf_counter()
+    for jti in jtis:
+        check(jti)
+    return (time.perf_counter() - started) / len(jtis) * 1e6
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    workdir = tempfile.mkdtemp()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(workdir, "bench.sqlite3")}'
+    app.config['CACHE_BACKEND'] = 'sqlite'
+    app.config['CACHE_PATH'] = os.path.join(workdir, 'cache.sqlite3')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=15)
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=7)
+    db.init_app(app)
+    revoked_tokens = RevokedTokens(app)
+
+    with app.app_context():
+        db.create_all()
+        revoked = [str(uuid.uuid4()) for _ in range(rows)]
+        db.session.execute(insert(TokenBlocklist), [{'jti': jti} for jti in revoked])
+        db.session.commit()
+
+        def query(jti):
+            return db.session.query(TokenBlocklist.id).filter_by(jti=jti).first() is not None
+
+        active = [str(uuid.uuid4()) for _ in range(CHECKS)]
+        revoked_tokens.is_revoked(active[0])  # initial load of the blocklist
+        print(f'{rows} revoked tokens, {CHECKS} checks')
+        for name, check in (('db query', query), ('jti cache', revoked_tokens.is_revoked)):
+            print(f'{name:10} not revoked {per_check(check, active):7.1f} us   revoked {per_check(check, revoked[:CHECKS]):7.1f} us')
+
+
+if __name__ == '__main__':
+    main()
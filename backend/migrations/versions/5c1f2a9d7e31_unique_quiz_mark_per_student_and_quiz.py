@@ -0,0 +1,35 @@
+"""unique quiz mark per student and quiz
+
+Revision ID: 5c1f2a9d7e31
+Revises: 4763c55b1303
+Create Date: 2026-10-18 11:20:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1f2a9d7e31'
+down_revision = '4763c55b1303'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # re-uploads used to append rows, keep only the most recent mark per (user_id, quiz_id).
+    # the derived table is needed because MySQL cannot select from the table it deletes from.
+    op.execute(
+        "DELETE FROM quiz_marks WHERE quiz_mark_id NOT IN ("
+        "SELECT keep_id FROM ("
+        "SELECT MAX(quiz_mark_id) AS keep_id FROM quiz_marks GROUP BY user_id, quiz_id"
+        ") AS latest_marks)"
+    )
+
+    with op.batch_alter_table('quiz_marks', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_quiz_marks_user_quiz', ['user_id', 'quiz_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_marks', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_quiz_marks_user_quiz', type_='unique')
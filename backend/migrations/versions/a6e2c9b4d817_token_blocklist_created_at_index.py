@@ -0,0 +1,27 @@
+"""token blocklist created_at index
+
+Revision ID: a6e2c9b4d817
+Revises: f3b8a1d5c274
+Create Date: 2026-10-18 21:12:44.908211
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6e2c9b4d817'
+down_revision = 'f3b8a1d5c274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # revocation sync reads the blocklist by created_at window
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_token_blocklist_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_created_at'))
@@ -0,0 +1,31 @@
+"""gradebook summary sums in double precision
+
+Revision ID: b2c7e9f4a153
+Revises: d5f1a7c3b962
+Create Date: 2026-10-18 22:31:08.641205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2c7e9f4a153'
+down_revision = 'd5f1a7c3b962'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('student_grade_summaries', 'quiz_grade_summaries'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('score_sum', existing_type=sa.Float(), type_=sa.Double(), existing_nullable=False)
+            batch_op.alter_column('score_sum_squares', existing_type=sa.Float(), type_=sa.Double(), existing_nullable=False)
+    # sums already rounded to single precision are not exact; `flask gradebook rebuild-summary` recomputes them
+
+
+def downgrade():
+    for table in ('student_grade_summaries', 'quiz_grade_summaries'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('score_sum', existing_type=sa.Double(), type_=sa.Float(), existing_nullable=False)
+            batch_op.alter_column('score_sum_squares', existing_type=sa.Double(), type_=sa.Float(), existing_nullable=False)
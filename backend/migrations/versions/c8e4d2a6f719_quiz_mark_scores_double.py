@@ -0,0 +1,37 @@
+"""quiz mark scores in double precision
+
+Revision ID: c8e4d2a6f719
+Revises: b2c7e9f4a153
+Create Date: 2026-10-18 22:48:52.307716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e4d2a6f719'
+down_revision = 'b2c7e9f4a153'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # a single-precision FLOAT stores 3.3 as 3.2999999523..., which never equals the uploaded 3.3,
+    # so re-uploads counted unchanged marks as updates. Existing rounded scores are rewritten
+    # with their exact value the next time they are uploaded.
+    with op.batch_alter_table('quiz_marks', schema=None) as batch_op:
+        batch_op.alter_column('score', existing_type=sa.Float(), type_=sa.Double(), existing_nullable=False)
+    for table in ('student_grade_summaries', 'quiz_grade_summaries'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('score_min', existing_type=sa.Float(), type_=sa.Double(), existing_nullable=True)
+            batch_op.alter_column('score_max', existing_type=sa.Float(), type_=sa.Double(), existing_nullable=True)
+
+
+def downgrade():
+    for table in ('student_grade_summaries', 'quiz_grade_summaries'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('score_min', existing_type=sa.Double(), type_=sa.Float(), existing_nullable=True)
+            batch_op.alter_column('score_max', existing_type=sa.Double(), type_=sa.Float(), existing_nullable=True)
+    with op.batch_alter_table('quiz_marks', schema=None) as batch_op:
+        batch_op.alter_column('score', existing_type=sa.Double(), type_=sa.Float(), existing_nullable=False)
@@ -0,0 +1,39 @@
+"""token expiry columns
+
+Revision ID: c9d2f4a6e813
+Revises: e4a8c61f0b27
+Create Date: 2026-10-18 16:02:37.104518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d2f4a6e813'
+down_revision = 'e4a8c61f0b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing rows keep expires_at NULL; the purge ages those out by created_at instead
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_token_blocklist_expires_at'), ['expires_at'], unique=False)
+
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_expires_at'), ['expires_at'], unique=False)
+        batch_op.create_index('ix_refresh_tokens_uid_revoked', ['uid', 'revoked'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.drop_index('ix_refresh_tokens_uid_revoked')
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_expires_at'))
+        batch_op.drop_column('expires_at')
+
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_expires_at'))
+        batch_op.drop_column('expires_at')
@@ -0,0 +1,81 @@
+import importlib
+import pkgutil
+import bcrypt
+import pytest
+import app.models
+from app import create_app, db
+
+# some models are only imported where they are used; create_all needs every one of them
+for module in pkgutil.walk_packages(app.models.__path__, 'app.models.'):
+    importlib.import_module(module.name)
+
+PASSWORD = 'Passw0rd!'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # create_app reads its settings from the environment
+    monkeypatch.setenv('SECRET_KEY', 'test-secret')
+    monkeypatch.setenv('JWT_SECRET_KEY', 'test-jwt-secret')
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('RATELIMIT_STORAGE_URI', 'memory://')
+    monkeypatch.setenv('CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setenv('JOB_DIR', str(tmp_path / 'jobs'))
+    monkeypatch.setenv('QUERY_COUNT_HEADER', '1')
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '0')
+    monkeypatch.setenv('BCRYPT_LOG_ROUNDS', '4')
+
+    app = create_app()
+    # the test client talks plain http and sends no CSRF header
+    app.config.update(JWT_COOKIE_SECURE=False, JWT_COOKIE_CSRF_PROTECT=False, RATELIMIT_ENABLED=False)
+
+    # no app context is left pushed: requests would share it, and its session's identity map would hide queries
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    from app.models.User import User
+
+    def make_user(email='student@example.com', **fields):
+        with app.app_context():
+            user = User(
+                email=email,
+                password_hash=bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(4)).decode('utf-8'),
+                name=fields.pop('name', email.split('@')[0]),
+                **fields
+            )
+            db.session.add(user)
+            db.session.commit()
+            return user.uid
+    return make_user
+
+
+@pytest.fixture
+def make_courses(app):
+    from app.models.User import User
+    from app.models.Course import Course
+
+    def make_courses(count, student_ids=()):
+        with app.app_context():
+            students = User.query.filter(User.uid.in_(student_ids)).all()
+            courses = [Course(course_code=f'C{i}', course_name=f'Course {i}') for i in range(count)]
+            for course in courses:
+                course.students.extend(students)
+            db.session.add_all(courses)
+            db.session.commit()
+            return [course.course_id for course in courses]
+    return make_courses
+
+
+def query_count(response):
+    return int(response.headers['X-Query-Count'])
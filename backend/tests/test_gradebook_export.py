@@ -0,0 +1,37 @@
+"""The gradebook export writes scores back exactly as they were stored."""
+import csv
+import io
+from conftest import PASSWORD
+from app import db
+
+
+def test_csv_export_keeps_stored_precision(app, client, make_user, make_courses):
+    from app.models.Quiz import Quiz
+    from app.models.QuizMark import QuizMark
+
+    make_user('admin@example.com', role='admin')
+    students = [make_user(f'student{i}@example.com', kauid=1000 + i) for i in range(3)]
+    course_id, = make_courses(1, students)
+    # more significant digits than float32 keeps, a decimal that has no exact binary form, a whole mark, and a gap
+    scores = {students[0]: [12.345678901, 3.3], students[1]: [88.0, None], students[2]: [0.1, 99.99999]}
+    with app.app_context():
+        quizzes = [Quiz(title='Quiz 1', course_id=course_id), Quiz(title='Quiz 2', course_id=course_id)]
+        db.session.add_all(quizzes)
+        db.session.flush()
+        for uid, marks in scores.items():
+            for quiz, score in zip(quizzes, marks):
+                if score is not None:
+                    db.session.add(QuizMark(user_id=uid, quiz_id=quiz.quiz_id, score=score))
+        db.session.commit()
+
+    client.post('/api/login', json={'email': 'admin@example.com', 'password': PASSWORD})
+    response = client.get(f'/api/admin/courses/{course_id}/gradebook.csv')
+
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0][1:] == ['Quiz 1', 'Quiz 2']
+    assert rows[1:] == [
+        ['1000', '12.345678901', '3.3'],
+        ['1001', '88', ''],
+        ['1002', '0.1', '99.99999'],
+    ]
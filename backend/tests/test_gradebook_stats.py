@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from app.services.gradebook_stats import group_stats, total_stats, PERCENTILES
+
+
+@pytest.fixture
+def marks():
+    rng = np.random.default_rng(7)
+    groups = rng.integers(0, 400, size=40_000)
+    # one decimal, with fractional extremes and a share of zeros
+    scores = np.round(rng.uniform(0.03, 87.3, size=groups.size), 1)
+    scores[rng.random(groups.size) < 0.05] = 0.0
+    scores[0], scores[1] = 0.03, 87.3
+    return groups, scores
+
+
+def test_group_order_statistics_match_numpy(marks):
+    groups, scores = marks
+    stats = group_stats(groups, scores, 10, 0.0, 100.0, 50.0)
+
+    for i, key in enumerate(stats["keys"]):
+        group = scores[groups == key]
+        assert stats["count"][i] == group.size
+        assert stats["min"][i] == group.min()
+        assert stats["max"][i] == group.max()
+        np.testing.assert_allclose(stats["percentiles"][i], np.percentile(group, PERCENTILES))
+        np.testing.assert_allclose(stats["mean"][i], group.mean())
+
+
+def test_total_order_statistics_match_numpy(marks):
+    groups, scores = marks
+    overall = total_stats(group_stats(groups, scores, 10, 0.0, 100.0, 50.0), scores)
+
+    assert overall["min"][0] == scores.min()
+    assert overall["max"][0] == scores.max()
+    np.testing.assert_allclose(overall["percentiles"][0], np.percentile(scores, PERCENTILES))
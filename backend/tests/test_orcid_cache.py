@@ -0,0 +1,168 @@
+"""The stale-while-revalidate ORCID cache, against a local stub of the ORCID API."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.services.extenstions import orcid_cache, orcid_client
+
+WORKS_URL = '/api/orcid/researches'
+WORK_URL = '/api/orcid/researche/{}'
+
+
+class StubOrcid:
+    """Answers /<orcid id>/works with one work titled `title` and /<orcid id>/work/11 with its
+    record, 404 for other put-codes, or 503 for everything while `down`."""
+
+    def __init__(self):
+        self.title = 'First title'
+        self.down = False
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.requests += 1
+                if stub.down:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                work = {
+                    'put-code': 11,
+                    'title': {'title': {'value': stub.title}},
+                    'type': 'journal-article',
+                    'publication-date': {'year': {'value': '2021'}},
+                }
+                if '/work/' in self.path:
+                    if not self.path.endswith('/work/11'):
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    body = json.dumps(work).encode('utf-8')
+                else:
+                    body = json.dumps({'group': [{'work-summary': [work]}]}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v3.0'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def orcid(app, monkeypatch):
+    with StubOrcid() as stub:
+        monkeypatch.setitem(app.config, 'ORCID_API_URL', stub.url)
+        # one attempt per call keeps the failure cases fast
+        monkeypatch.setattr(orcid_client, 'retries', 0)
+        yield stub
+
+
+def fetch(client):
+    response = client.get(WORKS_URL)
+    assert response.status_code == 200
+    titles = [work['title'] for work in response.json.get('researches', [])]
+    return response.headers.get('X-Cache'), titles
+
+
+def age_entry(seconds):
+    # move the cached works back in time instead of sleeping through the TTL
+    key = f'{orcid_cache.namespace}:works'
+    stored_at, value = orcid_cache.backend.get(key)
+    orcid_cache.backend.set(key, (stored_at - seconds, value))
+
+
+def wait_for_refresh(timeout=5):
+    deadline = time.monotonic() + timeout
+    while orcid_cache.stats()['refreshing'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not orcid_cache.stats()['refreshing']
+
+
+def test_hit(client, orcid):
+    assert fetch(client) == ('MISS', ['First title'])
+    assert fetch(client) == ('HIT', ['First title'])
+    assert orcid.requests == 1
+
+
+def test_stale_copy_is_served_while_it_refreshes_in_the_background(client, orcid):
+    fetch(client)
+    orcid.title = 'Second title'
+    age_entry(orcid_cache.ttl + 1)
+
+    assert fetch(client) == ('STALE', ['First title'])
+    wait_for_refresh()
+    assert orcid.requests == 2
+    assert fetch(client) == ('HIT', ['Second title'])
+
+
+def test_failed_background_refresh_keeps_the_stale_copy(client, orcid):
+    fetch(client)
+    orcid.down = True
+    age_entry(orcid_cache.ttl + 1)
+
+    assert fetch(client) == ('STALE', ['First title'])
+    wait_for_refresh()
+    assert orcid_cache.stats()['error'] == 1
+    assert fetch(client) == ('STALE', ['First title'])
+
+
+def test_error_past_max_stale_falls_back_to_the_old_copy(client, orcid):
+    fetch(client)
+    orcid.down = True
+    age_entry(orcid_cache.max_stale + 1)
+
+    # reloaded inline, and when that fails the old copy is still better than nothing
+    assert fetch(client) == ('STALE', ['First title'])
+    assert orcid.requests == 2
+
+
+def test_miss_past_max_stale_reloads_inline(client, orcid):
+    fetch(client)
+    orcid.title = 'Second title'
+    age_entry(orcid_cache.max_stale + 1)
+
+    assert fetch(client) == ('MISS', ['Second title'])
+    assert orcid.requests == 2
+    assert orcid_cache.stats()['refreshing'] == 0
+
+
+def test_error_without_a_copy(client, orcid):
+    orcid.down = True
+    response = client.get(WORKS_URL)
+
+    assert response.json['success'] is False
+    assert response.json['status'] == 503
+    assert 'X-Cache' not in response.headers
+
+
+def test_single_work_is_cached_per_put_code(client, orcid):
+    first = client.get(WORK_URL.format(11))
+    assert first.headers['X-Cache'] == 'MISS'
+    assert first.json['title']['title']['value'] == 'First title'
+
+    second = client.get(WORK_URL.format(11))
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.json == first.json
+    assert orcid.requests == 1
+
+
+def test_single_work_errors(client, orcid):
+    assert client.get(WORK_URL.format(12)).json == {'error': 'Failed to fetch work', 'status': 404}
+    assert client.get(WORK_URL.format('abc')).json == {'error': 'Failed to fetch work', 'status': 404}
+    # a missing work is not cached, the next request asks ORCID again
+    client.get(WORK_URL.format(12))
+    assert orcid.requests == 2
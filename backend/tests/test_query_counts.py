@@ -0,0 +1,80 @@
+"""Per-request SQL statement counts, read from the X-Query-Count header.
+
+The counts must not grow with the number of courses a user is enrolled in;
+each endpoint is exercised with one and with several enrollments.
+"""
+import pytest
+from conftest import PASSWORD, query_count
+
+
+def login(client, email='student@example.com'):
+    return client.post('/api/login', json={'email': email, 'password': PASSWORD})
+
+
+@pytest.fixture(params=[1, 5], ids=['one-course', 'five-courses'])
+def enrolled_user(request, make_user, make_courses):
+    uid = make_user(kauid=1001)
+    peers = [make_user(f'peer{i}@example.com', kauid=2000 + i) for i in range(3)]
+    make_courses(request.param, [uid] + peers)
+    return uid, request.param
+
+
+def test_register(client):
+    response = client.post('/api/register', json={'email': 'new@example.com', 'password': PASSWORD, 'name': 'New'})
+
+    assert response.status_code == 201
+    assert response.json['user']['course_ids'] == []
+    # email check, user insert, refresh token insert
+    assert query_count(response) == 3
+
+
+def test_register_duplicate_email(client, make_user):
+    make_user('taken@example.com')
+    response = client.post('/api/register', json={'email': 'taken@example.com', 'password': PASSWORD, 'name': 'Taken'})
+
+    assert response.status_code == 409
+    assert query_count(response) == 1
+
+
+def test_login(client, enrolled_user):
+    uid, courses = enrolled_user
+    response = login(client)
+
+    assert response.status_code == 200
+    assert len(response.json['user']['course_ids']) == courses
+    # user, its courses in one selectin query, refresh token insert
+    assert query_count(response) == 3
+
+
+def test_me(client, enrolled_user):
+    uid, courses = enrolled_user
+    login(client)
+
+    first = client.get('/api/me')
+    assert first.status_code == 200
+    assert len(first.json['user']['course_ids']) == courses
+    # revocation list sync and the user snapshot with its enrollments
+    assert query_count(first) == 2
+
+    # the snapshot is cached and the revocation list is current
+    second = client.get('/api/me')
+    assert second.json == first.json
+    assert query_count(second) == 0
+
+
+def test_user_courses(client, enrolled_user):
+    uid, courses = enrolled_user
+    response = client.get(f'/api/user/courses/{uid}')
+
+    assert response.status_code == 200
+    assert len(response.json['courses']) == courses
+    assert all(course['enrollment_count'] == 4 for course in response.json['courses'])
+    # the user, then its courses with their enrollment counts
+    assert query_count(response) == 2
+
+
+def test_user_courses_unknown_user(client):
+    response = client.get('/api/user/courses/999')
+
+    assert response.status_code == 404
+    assert query_count(response) == 1